@@ -0,0 +1,383 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+
+# Offline benchmarks for YTDLer.
+#
+# Runs the downloader against a local HTTP server and a stand-in extractor,
+# so no network access is needed. Post-processing is not included since it
+# only measures FFmpeg. The startup benchmark runs YTDLer itself in new
+# processes, where the single URL is extracted by the generic extractor.
+#
+# Usage: python benchmarks/benchmark.py [--quick] [--json]
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import statistics
+import subprocess
+import argparse
+import tempfile
+import functools
+import threading
+import contextlib
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ytdl_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ytdl")
+sys.path.insert(0, ytdl_path)
+
+from youtube_dl.extractor.common import InfoExtractor
+
+from core import report
+from core import metrics
+from core import archive
+from core import session
+from core import dashboard
+from core import downloader
+from core import default_logger
+from core.hook import YTDLHook
+
+logger = default_logger.Logger()
+
+
+class LocalMediaHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the synthetic media without printing every request.
+    """
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalIE(InfoExtractor):
+    """
+    Stands in for the YouTube extractor and returns a
+    single format that is served by the local HTTP server.
+    """
+
+    IE_NAME = "youtube"
+    _VALID_URL = r"https?://www\.youtube\.com/watch\?v=(?P<id>[0-9A-Za-z_-]{11})"
+    media_url = None  # Set by `LocalServer()`.
+    media_size = None
+
+    @classmethod
+    def ie_key(cls):
+        return "Youtube"
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        return {
+            "id": video_id,
+            "title": f"Video {video_id}",
+            "formats": [
+                {
+                    "format_id": "18",
+                    "url": self.media_url,
+                    "ext": "mp4",
+                    "vcodec": "avc1",
+                    "acodec": "mp4a",
+                    "filesize": self.media_size
+                }
+            ]
+        }
+
+
+class LocalServer():
+    """
+    A local HTTP server that serves a synthetic media file.
+    """
+
+    def __init__(self, media_size: int):
+        """
+        The initialization method of LocalServer() class.
+
+        :param int media_size: The size of the media file in bytes.
+        """
+
+        self.media_dir = tempfile.mkdtemp(prefix="ytdler-media-")
+        with open(os.path.join(self.media_dir, "media.mp4"), "wb") as f:
+            f.write(os.urandom(media_size))
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(LocalMediaHandler, directory=self.media_dir))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        LocalIE.media_url = f"http://127.0.0.1:{self.server.server_port}/media.mp4"
+        LocalIE.media_size = media_size
+
+    def close(self):
+        self.server.shutdown()
+        shutil.rmtree(self.media_dir)
+
+
+def video_urls(count: int, start: int = 0):
+    """
+    Make a list of YouTube URLs with unique video IDs.
+
+    :param int count: The number of URLs.
+    :param int start: The number of the first video.
+
+    :returns list: The URLs.
+    """
+
+    return [f"https://www.youtube.com/watch?v={i:011d}" for i in range(start, start + count)]
+
+
+def make_downloader(workdir: str, url_list: list, jobs: int = 1, simulate: bool = False):
+    """
+    Create a Downloader() object and its Session() object in <workdir>.
+
+    :returns tuple: The Downloader() and Session() objects.
+    """
+
+    download_path = os.path.join(workdir, "downloads")
+    temp_dl_path = os.path.join(workdir, ".temp")
+    os.makedirs(download_path, exist_ok=True)
+    os.makedirs(temp_dl_path, exist_ok=True)
+    dl = downloader.Downloader(url_list, logger, download_path, temp_dl_path, simulate=simulate, jobs=jobs, cache_ttl=0)
+    ydl_opts = {
+        "logger": logger,
+        "simulate": simulate,
+        "format": "best",
+        "extract_flat": "in_playlist",
+        "match_filter": dl._match_filter,
+        "outtmpl": os.path.join(temp_dl_path, "%(title)s - %(id)s.%(ext)s")
+    }
+    return dl, session.Session(ydl_opts, logger, dl._hook, extractors=[LocalIE])
+
+
+def bench_fixed_overhead(count: int):
+    """
+    Measure the time spent on each URL when nothing is downloaded.
+
+    :param int count: The number of URLs.
+
+    :returns dict: The results.
+    """
+
+    with tempfile.TemporaryDirectory(prefix="ytdler-bench-") as workdir:
+        dl, ydl_session = make_downloader(workdir, video_urls(count), simulate=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = dl._run("video", ydl_session)
+            elapsed = time.perf_counter() - start
+
+    assert len(result["success"]) == count, result["failed"]
+    return {"urls": count, "ms_per_url": elapsed / count * 1000}
+
+
+def bench_skip_check(file_count: int, lookups: int = 1000):
+    """
+    Measure the cost of skipping already downloaded videos
+    when <file_count> files are in the download path.
+
+    :param int file_count: The number of downloaded files.
+    :param int lookups: The number of URLs to skip.
+
+    :returns dict: The results.
+    """
+
+    with tempfile.TemporaryDirectory(prefix="ytdler-bench-") as workdir:
+        dl, ydl_session = make_downloader(workdir, [])
+        for url in video_urls(file_count):
+            open(os.path.join(dl.download_path, f"Video - {url[-11:]}.mp4"), "w").close()
+
+        start = time.perf_counter()
+        dl.archive.rebuild(dl.download_path)
+        rebuild_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dl.archive = archive.DownloadArchive(dl.archive.archive_path, logger)
+        load_time = time.perf_counter() - start
+
+        url_list = video_urls(lookups, start=file_count - lookups)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for url in url_list:
+                url_info, url_result = dl._prefetch(url, None, ydl_session, dl.run_report.start_item(url, "video"))
+                assert url_result[0] == "skipped"
+
+            skip_time = time.perf_counter() - start
+
+    return {
+        "files": file_count,
+        "rebuild_s": rebuild_time,
+        "load_s": load_time,
+        "us_per_skip": skip_time / lookups * 1000000
+    }
+
+
+def bench_hook(callbacks: int, jobs: int = 8):
+    """
+    Measure the cost of each progress hook call and of each dashboard frame.
+
+    :param int callbacks: The number of hook calls.
+    :param int jobs: The number of jobs shown in the dashboard.
+
+    :returns dict: The results.
+    """
+
+    board = dashboard.Dashboard(logger, stream=io.StringIO())
+    hook = YTDLHook(logger, board, report.RunReport(logger), metrics.Metrics(logger), {}, "job_0")
+    total_bytes = callbacks * 1024
+    events = [
+        {
+            "status": "downloading",
+            "filename": "video.mp4",
+            "downloaded_bytes": i * 1024,
+            "total_bytes": total_bytes,
+            "speed": 1048576.0,
+            "eta": callbacks - i
+        }
+        for i in range(callbacks)
+    ]
+
+    start = time.perf_counter()
+    for d in events:
+        hook.main(d)
+
+    hook_time = time.perf_counter() - start
+
+    for i in range(jobs):
+        board.begin(f"job_{i}", f"Video {i}")
+        board.publish(f"job_{i}", events[callbacks // 2])
+
+    frames = 1000
+    start = time.perf_counter()
+    for _ in range(frames):
+        board.render()
+
+    render_time = time.perf_counter() - start
+    return {
+        "callbacks": callbacks,
+        "ns_per_callback": hook_time / callbacks * 1000000000,
+        "us_per_frame": render_time / frames * 1000000
+    }
+
+
+def bench_throughput(jobs: int, count: int, media_size: int):
+    """
+    Measure the end-to-end download throughput with <jobs> jobs.
+
+    :param int jobs: The number of URLs to download at the same time.
+    :param int count: The number of URLs.
+    :param int media_size: The size of each media file in bytes.
+
+    :returns dict: The results.
+    """
+
+    with tempfile.TemporaryDirectory(prefix="ytdler-bench-") as workdir:
+        dl, ydl_session = make_downloader(workdir, video_urls(count), jobs=jobs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = dl._run("video", ydl_session)
+            elapsed = time.perf_counter() - start
+
+    assert len(result["success"]) == count, result["failed"]
+    return {
+        "jobs": jobs,
+        "urls": count,
+        "urls_per_s": count / elapsed,
+        "mb_per_s": count * media_size / elapsed / 1048576
+    }
+
+
+def bench_startup(runs: int, count: int = 20):
+    """
+    Measure the cold start time of YTDLer for `--help`, a rerun where
+    every URL is skipped, and a single URL with `--simulate`.
+
+    :param int runs: The number of times each command is run.
+    :param int count: The number of URLs in the rerun.
+
+    :returns dict: The median time of each command.
+    """
+
+    commands = {
+        "help": ["--help"],
+        "skipped_rerun": ["-v", ','.join(video_urls(count))],
+        "simulate": ["-v", "--simulate", "--no-subs", LocalIE.media_url]
+    }
+    results = {"runs": runs, "urls": count}
+    with tempfile.TemporaryDirectory(prefix="ytdler-bench-") as workdir:
+        os.makedirs(os.path.join(workdir, "downloads"))
+        download_archive = archive.DownloadArchive(os.path.join(workdir, "downloads", ".archive"), logger)
+        for url in video_urls(count):
+            download_archive.add("Youtube", url[-11:])
+
+        for name, args in commands.items():
+            times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                process = subprocess.run([sys.executable, ytdl_path] + args, cwd=workdir, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                times.append(time.perf_counter() - start)
+                assert process.returncode == 0, process.stdout.decode(errors="replace")
+
+            results[f"{name}_s"] = statistics.median(times)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for YTDLer.")
+    parser.add_argument("--quick", action="store_true", help="Use smaller sizes.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    media_size = (1 if args.quick else 8) * 1048576
+    server = LocalServer(media_size)
+    try:
+        results = {
+            "fixed_overhead": bench_fixed_overhead(20 if args.quick else 200),
+            "skip_check": [bench_skip_check(count) for count in ((10000,) if args.quick else (10000, 100000))],
+            "hook": bench_hook(10000 if args.quick else 100000),
+            "throughput": [bench_throughput(jobs, 4 if args.quick else 16, media_size) for jobs in (1, 2, 4, 8)],
+            "startup": bench_startup(3 if args.quick else 10)
+        }
+
+    finally:
+        server.close()
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return
+
+    print(f"[i] Fixed overhead: {results['fixed_overhead']['ms_per_url']:.2f}ms per URL ({results['fixed_overhead']['urls']} URLs)")
+    for r in results["skip_check"]:
+        print(f"[i] Skip check with {r['files']} files: {r['us_per_skip']:.1f}us per URL, rebuild {r['rebuild_s']:.2f}s, archive load {r['load_s'] * 1000:.1f}ms")
+
+    print(f"[i] Progress hook: {results['hook']['ns_per_callback']:.0f}ns per callback, {results['hook']['us_per_frame']:.0f}us per dashboard frame")
+    for r in results["throughput"]:
+        print(f"[i] Throughput with {r['jobs']} job(s): {r['mb_per_s']:.1f}MB/s, {r['urls_per_s']:.2f} URLs/s")
+
+    r = results["startup"]
+    print(f"[i] Startup: `--help` {r['help_s'] * 1000:.0f}ms, rerun with {r['urls']} skipped URLs {r['skipped_rerun_s'] * 1000:.0f}ms, one URL with `--simulate` {r['simulate_s'] * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,16 +25,26 @@ OTHER DEALINGS IN THE SOFTWARE.
 For more information, please refer to <https://unlicense.org>
 """
 
+import sys
 from time import asctime
 
 from core import info
-from core import cmd_handler
-from core.SimpleLogger.logger import LoggingObject
 
-logger = LoggingObject(
-    name=info.name,
-    logfile=info.logfile
-)
-logger.info(f"{info.title} started on {asctime()}.")
+# The post-processing pool spawns processes that import this module again,
+# so only start the program when this is the main process.
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "submit":
+        # The daemon client does not need typer or youtube_dl.
+        from core import client
+        sys.exit(client.main(sys.argv[2:]))
 
-cmd_handler.main(logger)
+    from core import cmd_handler
+    from core.SimpleLogger.logger import LoggingObject
+
+    logger = LoggingObject(
+        name=info.name,
+        logfile=info.logfile
+    )
+    logger.info(f"{info.title} started on {asctime()}.")
+
+    cmd_handler.main(logger)
@@ -27,24 +27,55 @@ For more information, please refer to <https://unlicense.org>
 
 import os
 
+from core import info
+from core import archive
 from core import downloader
 from core import default_logger
 
 
+def rebuild_archive(download_path: str, logger = None):
+    """
+    Add every file that is already in <download_path> to the download archive.
+
+    :param str download_path: The path of the downloaded files.
+    :param class logger: The logger class.
+
+    :returns int: The number of videos added to the archive.
+    """
+
+    if logger is None:
+        logger = default_logger.Logger()
+
+    return archive.DownloadArchive(os.path.join(download_path, info.archive_file), logger).rebuild(download_path)
+
+
 class Download():
     """
     The class the uses the downloader module.
     """
 
-    def __init__(self, url: list, download_path: str, temp_dl_path: str, logger = None, debug: bool = False, simulate: bool = False, cookie_filepath: str = None):
+    def __init__(self, url: list, download_path: str, temp_dl_path: str, logger = None, debug: bool = False, simulate: bool = False, cookie_filepath: str = None, jobs: int = 1, prefetch: int = 2, connections: int = 1, cache_ttl: int = info.info_cache_ttl, format_cache_ttl: int = info.format_cache_ttl, run_report = None, run_metrics = None, fsync: str = "file", journal = None, partial_max_age: int = info.partial_max_age, partial_budget: int = 0, download_archive = None, postprocessing_pool = None):
         """
         The initialization method of Download() class.
 
-        :param list url: A list of URLs of the YouTube videos/playlists to download.
+        :param list url: A list (or a generator) of URLs of the YouTube videos/playlists to download.
         :param class logger: The logger class.
         :param bool debug: Debug mode.
         :param bool simulate: Do not download the video files.
         :param str cookie_filepath: The filepath of the cookie file. (Optional)
+        :param int jobs: The number of URLs to download at the same time.
+        :param int prefetch: The number of URLs to extract ahead of the downloads.
+        :param int connections: The number of connections used to download each file.
+        :param int cache_ttl: How long (in seconds) extracted info is cached. (0 disables the cache.)
+        :param int format_cache_ttl: How long (in seconds) cached info can be used for downloading.
+        :param class run_report: A report.RunReport() object to collect the timings of every phase. (Optional)
+        :param class run_metrics: A metrics.Metrics() object to collect the counters and latencies. (Optional)
+        :param str fsync: How the finished files are synced to the disk. ("none", "file" or "all")
+        :param class journal: A journal.Journal() object to record the state of every URL. (Optional)
+        :param int partial_max_age: Remove partial downloads older than this. (In seconds, 0 keeps them regardless of age.)
+        :param int partial_budget: The total size (in bytes) partial downloads can use. (0 means no limit.)
+        :param class download_archive: An archive.DownloadArchive() object to share between downloads. (Optional)
+        :param class postprocessing_pool: A process pool to share between downloads. (See `downloader.make_postprocessing_pool()`)
         """
 
         self.url = url
@@ -68,6 +99,54 @@ class Download():
         else:
             self.cookie_filepath = None
 
+        self.jobs = jobs
+        self.prefetch = prefetch
+        self.connections = connections
+        self.cache_ttl = cache_ttl
+        self.format_cache_ttl = format_cache_ttl
+        self.run_report = run_report
+        self.run_metrics = run_metrics
+        self.fsync = fsync
+        self.journal = journal
+        self.partial_max_age = partial_max_age
+        self.partial_budget = partial_budget
+        self.download_archive = download_archive
+        self.postprocessing_pool = postprocessing_pool
+
+    def _downloader(self, **overrides):
+        """
+        Make a downloader.Downloader() object with the options of this download.
+
+        :param overrides: The options to change for this downloader. (Optional)
+
+        :returns class: The downloader.Downloader() object.
+        """
+
+        options = {
+            "url": self.url,
+            "logger": self.logger,
+            "download_path": self.download_path,
+            "temp_dl_path": self.temp_dl_path,
+            "debug": self.debug,
+            "simulate": self.simulate,
+            "cookie_filepath": self.cookie_filepath,
+            "jobs": self.jobs,
+            "prefetch": self.prefetch,
+            "connections": self.connections,
+            "cache_ttl": self.cache_ttl,
+            "format_cache_ttl": self.format_cache_ttl,
+            "run_report": self.run_report,
+            "run_metrics": self.run_metrics,
+            "fsync": self.fsync,
+            "journal": self.journal,
+            "partial_max_age": self.partial_max_age,
+            "partial_budget": self.partial_budget,
+            "download_archive": self.download_archive,
+            "postprocessing_pool": self.postprocessing_pool
+        }
+        options.update(overrides)
+        return downloader.Downloader(**options)
+
     def video(self, embed_subs: bool = True, no_audio: bool = False, quality_override: bool = False, no_overwrites: bool = True):
         """
         Download video (with optional audio) from <self.url>.
@@ -81,15 +160,7 @@ class Download():
                        {"success": [(<url>, <title>)], "failed": [(<url>, <title>)], "skipped": [(<url>, <title>)]}
         """
 
-        return downloader.Downloader(
-            url=self.url,
-            logger=self.logger,
-            download_path=self.download_path,
-            temp_dl_path=self.temp_dl_path,
-            debug=self.debug,
-            simulate=self.simulate,
-            cookie_filepath=self.cookie_filepath
-        ).video(
+        return self._downloader().video(
             embed_subs=embed_subs,
             no_audio=no_audio,
             quality_override=quality_override,
@@ -107,16 +178,25 @@ class Download():
         :returns dict: A dictionary with three tuples (success, failed, and skipped) that contain strings of urls.
         """
 
-        return downloader.Downloader(
-            url=self.url,
-            logger=self.logger,
-            download_path=self.download_path,
-            temp_dl_path=self.temp_dl_path,
-            debug=self.debug,
-            simulate=self.simulate,
-            cookie_filepath=self.cookie_filepath
-        ).audio(
+        return self._downloader().audio(
             no_lyrics=no_lyrics,
             quality_override=quality_override,
             no_overwrites=no_overwrites
         )
+
+    def video_audio(self, embed_subs: bool = True, quality_override: bool = False, no_overwrites: bool = True):
+        """
+        Download video and audio from <self.url> in a single pass.
+
+        :param bool embed_subs: Embed the subtitles and convert them to lyrics?
+        :param bool quality_override: Override quality?
+        :param bool no_overwrites: Avoid overwriting file if it already exists.
+
+        :returns dict: A dictionary with 3 tuples (success, failed, and skipped) that contain tuples with two strings for urls and titles.
+        """
+
+        return self._downloader().video_audio(
+            embed_subs=embed_subs,
+            quality_override=quality_override,
+            no_overwrites=no_overwrites
+        )
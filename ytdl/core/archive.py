@@ -0,0 +1,153 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+import threading
+
+
+class DownloadArchive():
+    """
+    An append-only log of downloaded videos, loaded into a set for fast lookups.
+
+    Each line contains the lowercase extractor key and the video ID separated
+    by a space (e.g., `youtube dQw4w9WgXcQ`), which is the same format used
+    by youtube-dl's `--download-archive` option.
+    """
+
+    def __init__(self, archive_path: str, logger = None):
+        """
+        The initialization method of DownloadArchive() class.
+
+        :param str archive_path: The filepath of the archive file.
+        :param class logger: The logger class. (Optional)
+        """
+
+        self.archive_path = archive_path
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._entries = set()
+        if os.path.exists(self.archive_path):
+            with open(self.archive_path, 'r', encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self._entries.add(line)
+
+        if self.logger is not None:
+            self.logger.info(f"Loaded {len(self._entries)} entries from the download archive.")
+
+    @staticmethod
+    def make_key(extractor: str, video_id: str):
+        """
+        Make the archive key of a video.
+
+        :param str extractor: The extractor key. (e.g., `Youtube`)
+        :param str video_id: The ID of the video.
+
+        :returns str: The archive key.
+        """
+
+        return f"{extractor.lower()} {video_id}"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def contains(self, extractor: str, video_id: str):
+        """
+        Check if a video is in the archive.
+
+        :param str extractor: The extractor key. (e.g., `Youtube`)
+        :param str video_id: The ID of the video.
+
+        :returns bool: True if the video is already downloaded.
+        """
+
+        return self.make_key(extractor, video_id) in self._entries
+
+    def add(self, extractor: str, video_id: str):
+        """
+        Add a video to the archive.
+
+        :param str extractor: The extractor key. (e.g., `Youtube`)
+        :param str video_id: The ID of the video.
+        """
+
+        self._append([self.make_key(extractor, video_id)])
+
+    def _append(self, keys: list):
+        """
+        Append new keys to the archive file.
+
+        :param list keys: The archive keys to add.
+
+        :returns int: The number of keys that were not in the archive yet.
+        """
+
+        with self._lock:
+            new_keys = []
+            for key in keys:
+                if key not in self._entries:
+                    self._entries.add(key)
+                    new_keys.append(key)
+
+            if len(new_keys) > 0:
+                with open(self.archive_path, 'a', encoding="utf-8") as f:
+                    f.write(''.join(key + '\n' for key in new_keys))
+
+            return len(new_keys)
+
+    def rebuild(self, download_path: str, extractor: str = "youtube"):
+        """
+        Add every video in <download_path> to the archive.
+
+        Files are expected to be named using the `%(title)s - %(id)s.%(ext)s`
+        output template. The extractor cannot be known from the filename,
+        so every file is added using <extractor>.
+
+        :param str download_path: The path of the downloaded files.
+        :param str extractor: The extractor key to use.
+
+        :returns int: The number of videos added to the archive.
+        """
+
+        keys = []
+        archive_filename = os.path.basename(self.archive_path)
+        with os.scandir(download_path) as entries:
+            for entry in entries:
+                if entry.name == archive_filename or not entry.is_file() or " - " not in entry.name:
+                    continue
+
+                # `<title> - <id>.<ext>` (The extension may contain dots, e.g., `.en.lrc`.)
+                video_id = entry.name.rsplit(" - ", 1)[1].split('.', 1)[0]
+                if video_id != "":
+                    keys.append(self.make_key(extractor, video_id))
+
+        added = self._append(keys)
+        if self.logger is not None:
+            self.logger.info(f"Added {added} entries to the download archive.")
+
+        return added
@@ -0,0 +1,233 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+
+import os
+import re
+import time
+import threading
+
+from core import info
+from core import default_logger
+
+
+def parse_bytes(text: str):
+    """
+    Parse a size or a rate like YouTube-DL's `--limit-rate`. (e.g. `50K` or `4.2M`)
+
+    This is `FileDownloader.parse_bytes()`, so that parsing the options does not import youtube_dl.
+
+    :param str text: The size.
+
+    :returns int: The size in bytes, or None if <text> is not a valid size.
+    """
+
+    match = re.match(r"(?i)^(\d+(?:\.\d+)?)([kMGTPEZY]?)$", text)
+    if match is None:
+        return None
+
+    return int(round(float(match.group(1)) * 1024.0 ** "bkmgtpezy".index(match.group(2).lower())))
+
+
+class BandwidthScheduler():
+    """
+    A token bucket shared by every download in the process.
+
+    The bucket is refilled at <limit> bytes per second. When several jobs
+    are waiting for it, the tokens are given out in proportion to their
+    weights, using start-time fair queuing.
+
+    The limit and the weights can be changed while downloading by editing
+    the control file, which is checked every `info.bandwidth_check_interval`
+    seconds. Its first line is the limit (e.g. `2M`, or `0` for no limit),
+    and each of the next lines is a weight (e.g. `job_0=2`).
+    """
+
+    def __init__(self, logger = None):
+        """
+        The initialization method of BandwidthScheduler() class.
+
+        :param class logger: The logger class.
+        """
+
+        self.logger = logger or default_logger.Logger()
+        self.limit = 0  # Bytes per second. (0 means there is no limit.)
+        self.weights = {}  # The weight of each job. (Jobs not here have a weight of 1.)
+        self.control_file = None
+
+        self._cond = threading.Condition()
+        self._tokens = 0
+        self._refilled = time.monotonic()
+        self._virtual_time = 0
+        self._finish_tags = {}  # When each job's last request finishes in virtual time.
+        self._waiting = {}  # The start tag of each waiting request.
+        self._checked = 0
+        self._control_mtime = None
+
+    def configure(self, limit: int = 0, weights: dict = None, control_file: str = None, logger = None):
+        """
+        Set the limit, the weights, and the control file.
+
+        :param int limit: The limit in bytes per second. (0 means there is no limit.)
+        :param dict weights: The weight of each job. (Optional)
+        :param str control_file: The file to read the limit and the weights from while downloading. (Optional)
+        :param class logger: The logger class. (Optional)
+        """
+
+        if logger is not None:
+            self.logger = logger
+
+        self.set_limit(limit, weights)
+        self.control_file = control_file
+        self._control_mtime = None
+        self._checked = 0
+
+    def set_limit(self, limit: int, weights: dict = None):
+        """
+        Change the limit and the weights.
+
+        :param int limit: The limit in bytes per second. (0 means there is no limit.)
+        :param dict weights: The weight of each job. (Optional)
+        """
+
+        with self._cond:
+            self.logger.info(f"Setting the bandwidth limit to {limit} bytes per second.")
+            self.limit = limit
+            self.weights = dict(weights or {})
+            self._tokens = min(self._tokens, limit) if limit > 0 else 0
+            self._refilled = time.monotonic()
+            self._cond.notify_all()
+
+    @staticmethod
+    def parse(text: str):
+        """
+        Parse the contents of a control file.
+
+        :param str text: The limit on the first line, and the weights on the next lines. (Separated by newlines or commas)
+
+        :returns tuple: The limit and the weights.
+        """
+
+        lines = [line.strip() for line in text.splitlines() if line.strip() and not line.strip().startswith('#')]
+        if len(lines) == 0:
+            return 0, {}
+
+        limit = parse_bytes(lines[0])
+        if limit is None:
+            raise ValueError(f"`{lines[0]}` is not a valid rate.")
+
+        weights = {}
+        for item in ','.join(lines[1:]).split(','):
+            if item.strip() == '':
+                continue
+
+            job_name, _, weight = item.partition('=')
+            try:
+                weights[job_name.strip()] = float(weight)
+
+            except ValueError:
+                raise ValueError(f"`{item.strip()}` is not a valid weight. (e.g., `job_0=2`)")
+
+            if weights[job_name.strip()] <= 0:
+                raise ValueError(f"The weight of `{job_name.strip()}` must be more than 0.")
+
+        return limit, weights
+
+    def _check_control_file(self):
+        """
+        Reload the control file if it changed.
+        """
+
+        now = time.monotonic()
+        if self.control_file is None or now - self._checked < info.bandwidth_check_interval:
+            return
+
+        self._checked = now
+        try:
+            mtime = os.stat(self.control_file).st_mtime
+            if mtime == self._control_mtime:
+                return
+
+            self._control_mtime = mtime
+            with open(self.control_file, 'r') as f:
+                limit, weights = self.parse(f.read())
+
+        except FileNotFoundError:
+            return
+
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Cannot read the bandwidth control file: {e}")
+            return
+
+        self.set_limit(limit, weights)
+
+    def _refill(self):
+        """
+        Add the tokens earned since the last refill. The lock must be held.
+        """
+
+        now = time.monotonic()
+        # Allow bursts of up to one second worth of bytes.
+        self._tokens = min(self.limit, self._tokens + (now - self._refilled) * self.limit)
+        self._refilled = now
+
+    def consume(self, job_name: str, byte_count: int):
+        """
+        Wait until <job_name> is allowed to download <byte_count> bytes.
+
+        :param str job_name: The name of the job.
+        :param int byte_count: The number of bytes that were downloaded.
+        """
+
+        self._check_control_file()
+        if self.limit <= 0 or byte_count <= 0:
+            return
+
+        with self._cond:
+            start_tag = max(self._finish_tags.get(job_name, 0), self._virtual_time)
+            self._finish_tags[job_name] = start_tag + byte_count / self.weights.get(job_name, 1)
+            ticket = object()
+            self._waiting[ticket] = start_tag
+            try:
+                while self.limit > 0:
+                    self._refill()
+                    if self._tokens > 0 and start_tag <= min(self._waiting.values()):
+                        # Requests larger than the bucket are allowed to
+                        # take it into debt, which later requests wait for.
+                        self._tokens -= byte_count
+                        self._virtual_time = start_tag
+                        return
+
+                    self._cond.wait(max(-self._tokens / self.limit, info.bandwidth_min_wait))
+
+            finally:
+                del self._waiting[ticket]
+                self._cond.notify_all()
+
+
+# The scheduler shared by every download.
+scheduler = BandwidthScheduler()
@@ -0,0 +1,174 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+import json
+import time
+import threading
+
+
+class InfoCache():
+    """
+    A persistent cache of the info dicts returned by `YoutubeDL.extract_info()`.
+
+    Each video is stored in its own JSON file, keyed by the extractor and the
+    video ID. The format URLs in an info dict are signed and expire long before
+    the rest of the metadata does, so cached info dicts are only used for
+    downloading while they are younger than <format_ttl> seconds.
+    """
+
+    def __init__(self, cache_path: str, ttl: int, format_ttl: int, logger = None):
+        """
+        The initialization method of InfoCache() class.
+
+        :param str cache_path: The path of the cache directory.
+        :param int ttl: How long (in seconds) the metadata stays valid.
+        :param int format_ttl: How long (in seconds) the format URLs stay valid.
+        :param class logger: The logger class. (Optional)
+        """
+
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.format_ttl = min(format_ttl, ttl)
+        self.logger = logger
+        os.makedirs(self.cache_path, exist_ok=True)
+
+    def _filepath(self, extractor: str, video_id: str):
+        """
+        Get the filepath of a cached info dict.
+
+        :param str extractor: The extractor key. (e.g., `Youtube`)
+        :param str video_id: The ID of the video.
+
+        :returns str: The filepath of the cache entry.
+        """
+
+        return os.path.join(self.cache_path, f"{extractor.lower()}-{video_id}.json".replace(os.sep, '_'))
+
+    def get(self, extractor: str, video_id: str, need_formats: bool = True):
+        """
+        Get a cached info dict.
+
+        :param str extractor: The extractor key. (e.g., `Youtube`)
+        :param str video_id: The ID of the video.
+        :param bool need_formats: The info dict will be used to download the video.
+
+        :returns dict: The info dict, or None if it is not cached or it already expired.
+        """
+
+        try:
+            with open(self._filepath(extractor, video_id), 'r', encoding="utf-8") as f:
+                entry = json.load(f)
+
+        except (OSError, ValueError):
+            return None
+
+        age = time.time() - entry.get("cached_at", 0)
+        if age > self.ttl:
+            self._remove(self._filepath(extractor, video_id))
+            return None
+
+        if need_formats and age > self.format_ttl:
+            return None
+
+        if self.logger is not None:
+            self.logger.info(f"Using the cached info of `{video_id}`.")
+
+        return entry["info"]
+
+    def put(self, url_info: dict):
+        """
+        Cache the info dicts of the videos in <url_info>.
+
+        :param dict url_info: The info dict returned by `YoutubeDL.extract_info()`.
+        """
+
+        for entry in url_info.get("entries") or [url_info]:
+            if entry is None or entry.get("_type", "video") != "video":
+                continue
+
+            filepath = self._filepath(entry["extractor_key"], entry["id"])
+            temp_filepath = f"{filepath}.{threading.get_ident()}.tmp"
+            try:
+                # Write to a temporary file first so that a crash (or another
+                # worker) never leaves a half-written cache entry behind.
+                with open(temp_filepath, 'w', encoding="utf-8") as f:
+                    json.dump({"cached_at": time.time(), "info": entry}, f)
+
+                os.replace(temp_filepath, filepath)
+
+            except (OSError, TypeError, ValueError) as e:
+                if self.logger is not None:
+                    self.logger.warning(f"Cannot cache the info of `{entry['id']}`: {e}")
+
+    def _remove(self, filepath: str):
+        """
+        Remove a cache entry, if it still exists.
+
+        :param str filepath: The filepath of the cache entry.
+
+        :returns bool: True if the entry was removed.
+        """
+
+        try:
+            os.remove(filepath)
+            return True
+
+        except OSError:
+            return False  # Another worker already removed it.
+
+    def sweep(self):
+        """
+        Remove the entries (and leftover temporary files) that are older than <self.ttl>.
+
+        The modification time of each file is used, so the entries are not read.
+
+        :returns int: The number of removed files.
+        """
+
+        removed = 0
+        now = time.time()
+        try:
+            with os.scandir(self.cache_path) as entries:
+                for entry in entries:
+                    try:
+                        expired = now - entry.stat().st_mtime > self.ttl
+
+                    except OSError:
+                        continue
+
+                    if expired and self._remove(entry.path):
+                        removed += 1
+
+        except OSError as e:
+            if self.logger is not None:
+                self.logger.warning(f"Cannot clean up the info cache: {e}")
+
+        if removed > 0 and self.logger is not None:
+            self.logger.info(f"Removed {removed} expired entries from the info cache.")
+
+        return removed
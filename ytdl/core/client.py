@@ -0,0 +1,142 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+import sys
+import json
+import argparse
+from urllib import request
+from urllib.error import HTTPError, URLError
+
+from core import info
+
+
+def call(port: int, path: str, body: dict = None):
+    """
+    Send a request to the daemon API.
+
+    :param int port: The local port of the daemon.
+    :param str path: The path of the endpoint.
+    :param dict body: The JSON body to POST. (GET if None)
+
+    :returns dict|list: The decoded response.
+    """
+
+    # Written by `daemon.Daemon.serve()`, see `daemon.token_path()`.
+    with open(os.path.join(os.path.expanduser('~'), info.daemon_token_file.format(port=port)), 'r') as f:
+        token = f.read().strip()
+
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    req = request.Request(f"http://127.0.0.1:{port}{path}", data=data, headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"})
+    try:
+        with request.urlopen(req) as response:
+            return json.loads(response.read())
+
+    except HTTPError as e:
+        raise ValueError(json.loads(e.read()).get("error", e.reason))
+
+
+def print_job(job: dict):
+    """
+    Print the status and the results of a job.
+
+    :param dict job: The job returned by the daemon.
+    """
+
+    print(f"[i] Job {job['id']}: {job['status']}")
+    if job["error"] is not None:
+        print("[E]", job["error"])
+
+    if job["results"] is None:
+        return
+
+    for status, prefix in (("success", '+'), ("failed", '-'), ("skipped", '*')):
+        for url in job["results"][status]:
+            print(f"    {prefix}", url[0], f"({url[1]})", *([f"-> {url[2]}"] if len(url) > 2 else []))
+
+
+def main(argv: list):
+    """
+    Submit URLs to a running `ytdl --daemon`, or get the status of a job.
+
+    This only imports the standard library, so it starts much faster than YTDLer itself.
+
+    :param list argv: The arguments after `submit`.
+
+    :returns int: The error code. (1 if the daemon is unreachable, 4 if the job has failed downloads or was cancelled)
+    """
+
+    parser = argparse.ArgumentParser(prog="ytdl submit", description="Submit URLs to a running `ytdl --daemon`.")
+    parser.add_argument("url", nargs='*', help="The URLs or files containing URLs to download.")
+    parser.add_argument("-v", "--video", action="store_true", help="Download video and audio. (Default if `--audio` is not set)")
+    parser.add_argument("-a", "--audio", action="store_true", help="Download audio only.")
+    parser.add_argument("--no-subs", action="store_true", help="Do not download video subtitles/audio lyrics.")
+    parser.add_argument("--no-audio", action="store_true", help="Do not download audio. (Only when `--video` is set)")
+    parser.add_argument("-p", "--port", type=int, default=info.daemon_port, help=f"The port of the daemon. (Default: {info.daemon_port})")
+    parser.add_argument("-w", "--wait", action="store_true", help="Wait until the job is finished and print the results.")
+    parser.add_argument("-s", "--status", type=int, metavar="ID", help="Print the status of a job instead of submitting one.")
+    args = parser.parse_args(argv)
+
+    if '-' in args.url:
+        # The URLs from the standard input are submitted with the other URLs.
+        args.url = [url for url in args.url if url != '-'] + [line.strip() for line in sys.stdin if line.strip()]
+
+    if args.status is None and len(args.url) == 0:
+        parser.error("there are no URLs to submit")
+
+    # The daemon may be running in another directory.
+    args.url = [os.path.abspath(url) if os.path.isfile(url) else url for url in args.url]
+
+    try:
+        if args.status is None:
+            job = call(args.port, "/jobs", {
+                "urls": args.url,
+                "video": args.video or not args.audio,
+                "audio": args.audio,
+                "no_subs": args.no_subs,
+                "no_audio": args.no_audio
+            })
+            print(f"[i] Submitted job {job['id']}.")
+
+        else:
+            job = call(args.port, f"/jobs/{args.status}")
+
+        while args.wait and job["status"] not in ("done", "failed", "cancelled"):
+            job = call(args.port, f"/jobs/{job['id']}?wait={info.daemon_max_wait}")
+
+    except (URLError, FileNotFoundError) as e:
+        print(f"[E] Cannot reach the daemon on port {args.port}:", getattr(e, "reason", e))
+        return 1
+
+    except ValueError as e:
+        print("[E]", e)
+        return 1
+
+    if args.status is not None or args.wait:
+        print_job(job)
+
+    return 4 if job["status"] in ("failed", "cancelled") else 0
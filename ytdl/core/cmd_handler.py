@@ -29,9 +29,7 @@ import os
 import typer
 import traceback
 
-from core import api
 from core import info
-from core import ytdl
 
 cmd_api = typer.Typer()
 
@@ -53,7 +51,7 @@ def main(logger):
     def parse_commands(
         url: str = typer.Argument(
             None,
-            help="The YouTube URL or a file containing YouTube URLs separated by a comma.",
+            help="The YouTube URL, a file containing YouTube URLs, or `-` to read URLs from the standard input. (Separated by a comma.)",
             show_default=False
         ),
         video: bool = typer.Option(
@@ -100,6 +98,125 @@ def main(logger):
             "--simulate",
             help="Do not download the video files.",
             show_default=False
+        ),
+        jobs: int = typer.Option(
+            1,
+            "--jobs",
+            "-j",
+            min=1,
+            help="The number of URLs to download at the same time."
+        ),
+        prefetch: int = typer.Option(
+            2,
+            "--prefetch",
+            min=1,
+            help="The number of URLs to extract ahead of the downloads."
+        ),
+        connections: int = typer.Option(
+            1,
+            "--connections",
+            min=1,
+            help="The number of connections used to download each file."
+        ),
+        limit_rate: str = typer.Option(
+            None,
+            "--limit-rate",
+            "-r",
+            help="The total download rate of every job in bytes per second. (e.g. 50K or 4.2M)",
+            show_default=False
+        ),
+        job_weights: str = typer.Option(
+            None,
+            "--job-weights",
+            help="The share of the download rate of each job when they are limited. (e.g. job_0=2,job_1=1)",
+            show_default=False
+        ),
+        bandwidth_file: str = typer.Option(
+            None,
+            "--bandwidth-file",
+            help="A file to change the download rate and job weights from while downloading.",
+            show_default=False
+        ),
+        cache_ttl: int = typer.Option(
+            info.info_cache_ttl,
+            "--cache-ttl",
+            min=0,
+            help="How long (in seconds) extracted video info is cached. (0 disables the cache.)"
+        ),
+        format_cache_ttl: int = typer.Option(
+            info.format_cache_ttl,
+            "--format-cache-ttl",
+            min=0,
+            help="How long (in seconds) cached video info can be used for downloading."
+        ),
+        rebuild_archive: bool = typer.Option(
+            False,
+            "--rebuild-archive",
+            help="Add the files that are already in the downloads folder to the download archive.",
+            show_default=False
+        ),
+        report_path: str = typer.Option(
+            None,
+            "--report",
+            help="Save the time spent in each phase of every URL to this JSON file.",
+            show_default=False
+        ),
+        events_path: str = typer.Option(
+            None,
+            "--events",
+            help="Write each phase of every URL to this JSON-lines file while downloading.",
+            show_default=False
+        ),
+        metrics_path: str = typer.Option(
+            None,
+            "--metrics-file",
+            help="Write Prometheus metrics to this file every few seconds. (For node_exporter's textfile collector.)",
+            show_default=False
+        ),
+        metrics_port: int = typer.Option(
+            None,
+            "--metrics-port",
+            min=1,
+            max=65535,
+            help="Serve Prometheus metrics at `http://127.0.0.1:<PORT>/metrics`.",
+            show_default=False
+        ),
+        fsync: str = typer.Option(
+            "file",
+            "--fsync",
+            help="How finished files are synced to the disk: `none`, `file` (before moving) or `all` (also the folder)."
+        ),
+        journal_path: str = typer.Option(
+            None,
+            "--journal",
+            help="Record the state of every URL to this file, so that the run can be resumed with `--resume`.",
+            show_default=False
+        ),
+        resume_path: str = typer.Option(
+            None,
+            "--resume",
+            help="Continue the run recorded in this journal. Finished URLs are not downloaded again.",
+            show_default=False
+        ),
+        partial_max_age: int = typer.Option(
+            info.partial_max_age,
+            "--partial-max-age",
+            min=0,
+            help="Remove partial downloads older than this many seconds. (0 keeps them regardless of age.)"
+        ),
+        partial_budget: str = typer.Option(
+            None,
+            "--partial-budget",
+            help="The total size partial downloads can use; the oldest are removed first. (e.g. 10G)",
+            show_default=False
+        ),
+        daemon_port: int = typer.Option(
+            None,
+            "--daemon",
+            min=1,
+            max=65535,
+            help=f"Keep running and download the jobs submitted to this local port with `ytdl submit`. (e.g. {info.daemon_port})",
+            show_default=False
         )
     ):
         try:
@@ -107,6 +224,8 @@ def main(logger):
                 print("Session ID:", logger.session_id)
                 print()
 
+            from core import ytdl  # Not imported before the options are parsed, so that `--help` starts quickly.
+
             error_code = ytdl.Main(
                 url=url,
                 video=video,
@@ -116,6 +235,25 @@ def main(logger):
                 quality_override=quality_override,
                 debug=debug,
                 simulate=simulate,
+                jobs=jobs,
+                prefetch=prefetch,
+                connections=connections,
+                limit_rate=limit_rate,
+                job_weights=job_weights,
+                bandwidth_file=bandwidth_file,
+                cache_ttl=cache_ttl,
+                format_cache_ttl=format_cache_ttl,
+                rebuild_archive=rebuild_archive,
+                report_path=report_path,
+                events_path=events_path,
+                metrics_path=metrics_path,
+                metrics_port=metrics_port,
+                fsync=fsync,
+                journal_path=journal_path,
+                resume_path=resume_path,
+                partial_max_age=partial_max_age,
+                partial_budget=partial_budget,
+                daemon_port=daemon_port,
                 logger=logger
             ).main()
 
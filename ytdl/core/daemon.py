@@ -0,0 +1,371 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+import hmac
+import json
+import time
+import queue
+import secrets
+import threading
+import traceback
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core import info
+from core import urls
+from core import report
+from core import journal
+
+# The statuses of the jobs that will not change anymore.
+finished_statuses = ("done", "failed", "cancelled")
+
+
+def token_path(port: int):
+    """
+    Get the filepath of the token of the daemon listening on <port>.
+
+    :param int port: The local port of the daemon.
+
+    :returns str: The filepath, in the home directory of the user.
+    """
+
+    return os.path.join(os.path.expanduser('~'), info.daemon_token_file.format(port=port))
+
+
+class Daemon():
+    """
+    Runs download jobs submitted over a local HTTP API in one long-running process.
+
+    Starting YTDLer imports typer and youtube_dl and loads the download
+    archive, which takes longer than downloading a short video. The daemon
+    pays for that once, and runs the jobs one at a time with the archive,
+    the info cache and the post-processing processes already warm.
+
+    The API is only served on 127.0.0.1, and every request must have the
+    token written to `token_path()` in an `Authorization: Bearer` header, a
+    local `Host` header, and (for POST) a JSON `Content-Type`, so that web
+    pages cannot submit jobs or read their results:
+        `POST /jobs` with `{"urls": [...], "video": true, "audio": false, "no_subs": false, "no_audio": false}`
+        `GET /jobs` lists the jobs.
+        `GET /jobs/<id>?wait=<seconds>` gets a job, waiting until it is finished if `wait` is given.
+    """
+
+    def __init__(self, main, cookie_exists: bool, logger):
+        """
+        The initialization method of Daemon() class.
+
+        :param class main: The ytdl.Main() object whose options are used for every job.
+        :param bool cookie_exists: Use `cookies.txt`?
+        :param class logger: The logger class.
+        """
+
+        self.main = main
+        self.cookie_exists = cookie_exists
+        self.logger = logger
+        self.jobs = {}  # The submitted jobs, by their IDs. (Only the last `info.daemon_max_jobs` finished jobs are kept.)
+        self.started_on = time.strftime("%Y%m%d-%H%M%S")
+        self._next_id = 1
+        self._queue = queue.Queue()
+        self._changed = threading.Condition()  # Notified when the status of a job changes.
+        self._stopping = False  # Set when CTRL+C is pressed; the queued jobs are cancelled.
+
+    def submit(self, sources: list, video: bool = True, audio: bool = False, no_subs: bool = False, no_audio: bool = False):
+        """
+        Add a job to the queue.
+
+        :param list sources: The URLs or files containing URLs to download.
+        :param bool video: Download video and audio.
+        :param bool audio: Download audio only.
+        :param bool no_subs: Do not download video subtitles/audio lyrics.
+        :param bool no_audio: Do not download audio. (Only when <video> is True.)
+
+        :returns dict: The job.
+        """
+
+        with self._changed:
+            job = {
+                "id": self._next_id,
+                "status": "queued",
+                "sources": list(sources),
+                "video": video,
+                "audio": audio,
+                "no_subs": no_subs,
+                "no_audio": no_audio,
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+                "results": None,
+                "error": None
+            }
+            self.jobs[job["id"]] = job
+            self._next_id += 1
+
+        self.logger.info(f"Job {job['id']} is submitted with {len(job['sources'])} sources.")
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: int = None):
+        """
+        Get a job, or every job.
+
+        :param int job_id: The ID of the job. (Every job if None)
+
+        :returns dict|list: The job (None if there is no such job), or the list of every job.
+        """
+
+        with self._changed:
+            if job_id is None:
+                return list(self.jobs.values())
+
+            return self.jobs.get(job_id)
+
+    def _job_path(self, path: str, job: dict):
+        """
+        Make the filepath of a per-job file, such as its journal, from <path>.
+
+        :param str path: The filepath given in the options. (e.g., `journal.jsonl`)
+        :param dict job: The job.
+
+        :returns str: The filepath with the start time of the daemon and the job ID. (e.g., `journal-20260101-120000-3.jsonl`)
+        """
+
+        root, ext = os.path.splitext(path)
+        return f"{root}-{self.started_on}-{job['id']}{ext}"
+
+    def _set(self, job: dict, **fields):
+        """
+        Update a job, forget the oldest finished jobs, and wake up the clients that are waiting for it.
+
+        :param dict job: The job.
+        :param **fields: The fields to change.
+        """
+
+        with self._changed:
+            job.update(fields)
+            finished = [job_id for job_id, old_job in self.jobs.items() if old_job["status"] in finished_statuses]
+            for job_id in finished[:max(0, len(finished) - info.daemon_max_jobs)]:
+                del self.jobs[job_id]  # The oldest finished jobs.
+
+            self._changed.notify_all()
+
+    def wait(self, job: dict, timeout: float):
+        """
+        Wait until a job is finished.
+
+        :param dict job: The job.
+        :param float timeout: The longest time (in seconds) to wait.
+        """
+
+        with self._changed:
+            self._changed.wait_for(lambda: job["status"] in finished_statuses, timeout)
+
+    def _run(self, job: dict):
+        """
+        Download the URLs of a job.
+
+        :param dict job: The job.
+        """
+
+        print()
+        print(f"[*] Starting job {job['id']}...")
+        self._set(job, status="running", started=time.time())
+        results = {"success": [], "failed": [], "skipped": []}
+        # Each job has its own report and journal, so that nothing is kept
+        # between jobs, and URLs finished by an earlier job are not skipped.
+        run_report = report.RunReport(self.logger, self.main.events_path)
+        run_journal = None
+        if self.main.journal_path is not None:
+            run_journal = journal.Journal(self._job_path(self.main.journal_path, job), self.logger, job["sources"])
+            run_journal.start()
+
+        try:
+            url_list = urls.read_urls(job["sources"], self.logger)
+            if job["video"] and job["audio"] and job["no_audio"]:
+                url_list = list(url_list)  # The URLs are downloaded twice, once for each mode.
+
+            for downloads in self.main.download(url_list, self.cookie_exists, job["video"], job["audio"], job["no_subs"], job["no_audio"], run_report, run_journal):
+                for status in results:
+                    results[status] += [list(item) for item in downloads[status]]
+
+        except Exception as e:
+            print(f"[E] Job {job['id']} failed:", e)
+            self.logger.error(f"Job {job['id']} failed: {e}")
+            self.logger.debug('\n' + traceback.format_exc())
+            self._set(job, status="failed", finished=time.time(), results=results, error=str(e))
+            return
+
+        finally:
+            if self.main.report_path is not None:
+                run_report.write(self._job_path(self.main.report_path, job))
+
+            run_report.close()
+            if run_journal is not None:
+                run_journal.close()
+
+        if len(results["failed"]) > 0:
+            print(f"[!] Job {job['id']} finished with failed downloads.")
+            self._set(job, status="failed", finished=time.time(), results=results)
+
+        else:
+            print(f"[*] Job {job['id']} is done.")
+            self._set(job, status="done", finished=time.time(), results=results)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+
+            if self._stopping:
+                print(f"[i] Job {job['id']} is cancelled.")
+                self._set(job, status="cancelled", finished=time.time())
+                continue
+
+            self._run(job)
+
+    def serve(self, port: int):
+        """
+        Serve the API on <port> and run the submitted jobs until CTRL+C is pressed.
+
+        :param int port: The local port of the API.
+        """
+
+        daemon = self
+        token = secrets.token_urlsafe(32)
+
+        class DaemonHandler(BaseHTTPRequestHandler):
+            def _authorized(self):
+                host = (self.headers.get("Host") or "").rsplit(':', 1)[0]
+                if host not in ("127.0.0.1", "localhost"):
+                    self._reply(403, {"error": "The daemon only accepts local requests."})  # DNS rebinding
+                    return False
+
+                if not hmac.compare_digest(self.headers.get("Authorization") or "", f"Bearer {token}"):
+                    self._reply(401, {"error": f"Missing or wrong token. (See `{token_path(port)}`.)"})
+                    return False
+
+                return True
+
+            def _reply(self, code: int, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+
+                url = urlparse(self.path)
+                parts = url.path.strip('/').split('/')
+                if parts == ["jobs"]:
+                    self._reply(200, daemon.get())
+                    return
+
+                job = None
+                if len(parts) == 2 and parts[0] == "jobs" and parts[1].isdigit():
+                    job = daemon.get(int(parts[1]))
+
+                if job is None:
+                    self._reply(404, {"error": "There is no such job."})
+                    return
+
+                wait = parse_qs(url.query).get("wait")
+                if wait:
+                    try:
+                        daemon.wait(job, min(float(wait[0]), info.daemon_max_wait))
+
+                    except ValueError:
+                        self._reply(400, {"error": "`wait` must be a number of seconds."})
+                        return
+
+                self._reply(200, job)
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+
+                if (self.headers.get("Content-Type") or "").split(';')[0].strip() != "application/json":
+                    self._reply(415, {"error": "Jobs must be sent as `application/json`."})
+                    return
+
+                if self.path.rstrip('/') != "/jobs":
+                    self._reply(404, {"error": "Jobs are submitted to `/jobs`."})
+                    return
+
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                    sources = request["urls"]
+                    if not isinstance(sources, list) or len(sources) == 0 or not all(isinstance(source, str) and source != '-' for source in sources):
+                        raise ValueError("`urls` must be a list of URLs or files.")
+
+                    if not request.get("video", True) and not request.get("audio", False):
+                        raise ValueError("Set `video` or `audio`.")
+
+                except (ValueError, KeyError, TypeError) as e:
+                    self._reply(400, {"error": f"Invalid job: {e}"})
+                    return
+
+                job = daemon.submit(
+                    sources,
+                    bool(request.get("video", True)),
+                    bool(request.get("audio", False)),
+                    bool(request.get("no_subs", False)),
+                    bool(request.get("no_audio", False))
+                )
+                self._reply(202, job)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), DaemonHandler)
+        # Only the user running the daemon can read the token.
+        token_fd = os.open(token_path(port), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(token_fd, 'w') as f:
+            f.write(token)
+
+        worker = threading.Thread(target=self._work, name="daemon_worker", daemon=True)
+        worker.start()
+        print(f"[i] The daemon is listening on `http://127.0.0.1:{port}/jobs`. (Press CTRL+C to stop.)")
+        self.logger.info(f"Daemon started on port {port}.")
+        try:
+            server.serve_forever()
+
+        except KeyboardInterrupt:
+            print()
+            print("[i] Stopping the daemon after the current job...")
+            self.logger.info("Stopping the daemon.")
+
+        finally:
+            server.server_close()
+            os.remove(token_path(port))
+            self._stopping = True
+            self._queue.put(None)
+            worker.join()
@@ -0,0 +1,295 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import sys
+import shutil
+import threading
+from datetime import timedelta
+
+from core import info
+
+# The units used by `size_converter()`, from smallest to largest.
+size_units = ("KB", "MB", "GB", "TB", "PB")  # Let's make PB the largest unit we'll use.
+
+
+def size_converter(bytes_to_convert: int, divisor: int = 1024):
+    """
+    Automatically convert bytes into kilobytes/megabytes/etc.
+
+    :param int bytes_to_convert: This is the float to be converted.
+    :param int divisor: As far as I know, there are people who use 1000 instead of 1024 so I won't hardcode it.
+
+    :returns tuple: The value and the unit. (B, KB, MB, GB, TB, PB)
+    """
+
+    if divisor == 0:
+        return (0, "B")
+
+    result = bytes_to_convert / divisor
+    unit = 0
+    while result > divisor and unit < len(size_units) - 1:
+        result = result / divisor
+        unit += 1
+
+    return (round(result, 2), size_units[unit])
+
+
+class _DashboardOutput():
+    """
+    Replaces `sys.stdout` while the dashboard is shown, so that
+    printed lines appear above the dashboard instead of inside it.
+    """
+
+    def __init__(self, dashboard, stream):
+        self._dashboard = dashboard
+        self._stream = stream
+
+    def write(self, text):
+        with self._dashboard._lock:
+            self._dashboard._clear()
+            if text:
+                self._dashboard._line_start = text.endswith('\n')
+
+            return self._stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class Dashboard():
+    """
+    Shows the progress of every running download in a single multi-line display.
+
+    Progress hooks only publish the latest event of their job, which is cheap.
+    A separate thread redraws the dashboard at a fixed frame rate using those
+    events, along with the total speed and the number of queued URLs.
+
+    When the output is not a terminal (e.g., a log file), the lines are
+    printed as they are every `info.plain_progress_interval` seconds instead.
+    """
+
+    def __init__(self, logger, queue_depth = None, postprocessing = None, stream = None):
+        """
+        The initialization method of Dashboard() class.
+
+        :param class logger: The logger class.
+        :param function queue_depth: A function that returns the number of URLs waiting to be downloaded. (Optional)
+        :param function postprocessing: A function that returns the number of URLs waiting to be post-processed. (Optional)
+        :param class stream: Where to draw the dashboard. (Default is `sys.stdout`)
+        """
+
+        self.logger = logger
+        self.queue_depth = queue_depth
+        self.postprocessing = postprocessing
+        self.stream = stream or sys.stdout
+        self.titles = {}  # The titles of the running jobs.
+        self.events = {}  # The last progress event of each running job.
+        self.finished = 0
+        # Redrawing lines only works on terminals.
+        self.enabled = hasattr(self.stream, "isatty") and self.stream.isatty()
+
+        self._lock = threading.RLock()
+        self._drawn_lines = 0
+        self._line_start = True
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self, job_name: str, d: dict):
+        """
+        Publish a progress event. This is called by the progress hooks.
+
+        :param str job_name: The name of the job.
+        :param dict d: The argument youtube_dl sends to the progress hooks.
+        """
+
+        self.events[job_name] = d
+
+    def begin(self, job_name: str, title: str):
+        """
+        Show a new job in the dashboard.
+
+        :param str job_name: The name of the job.
+        :param str title: The title of the video.
+        """
+
+        with self._lock:
+            self.events.pop(job_name, None)
+            self.titles[job_name] = title
+
+    def end(self, job_name: str):
+        """
+        Remove a finished job from the dashboard.
+
+        :param str job_name: The name of the job.
+        """
+
+        with self._lock:
+            self.events.pop(job_name, None)
+            self.titles.pop(job_name, None)
+            self.finished += 1
+
+    def start(self):
+        """
+        Start drawing the dashboard.
+        """
+
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        if not self.enabled:
+            self.logger.info("The output is not a terminal, printing the progress without redrawing.")
+            self._thread = threading.Thread(target=self._plain_loop, name="dashboard", daemon=True)
+            self._thread.start()
+            return
+
+        self.logger.info("Starting the progress dashboard.")
+        sys.stdout = _DashboardOutput(self, self.stream)
+        self._thread = threading.Thread(target=self._render_loop, name="dashboard", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop drawing the dashboard and remove it from the screen.
+        """
+
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._clear()
+            sys.stdout = self.stream
+
+        self.logger.info("Stopped the progress dashboard.")
+
+    def _clear(self):
+        """
+        Remove the dashboard from the screen. The lock must be held.
+        """
+
+        if self._drawn_lines > 0:
+            # Go to the first line of the dashboard and clear everything below it.
+            self.stream.write(f"\x1b[{self._drawn_lines}F\x1b[J")
+            self._drawn_lines = 0
+
+    def _job_line(self, job_name: str, title: str, d: dict):
+        """
+        Make the dashboard line of a job.
+
+        :param str job_name: The name of the job.
+        :param str title: The title of the video.
+        :param dict d: The last progress event of the job, or None.
+
+        :returns str: The line to show.
+        """
+
+        if d is None:
+            return f"[{job_name}] {title} | Starting..."
+
+        if d["status"] == "finished":
+            return f"[{job_name}] {title} | Post-processing..."
+
+        downloaded_bytes = d.get("downloaded_bytes") or 0
+        total_bytes = d.get("total_bytes") or d.get("total_bytes_estimate")
+        dl_size = size_converter(downloaded_bytes)
+        if total_bytes:
+            t_size = size_converter(total_bytes)
+            percentage = round((downloaded_bytes / total_bytes) * 100, 1)
+
+        else:
+            t_size = ("---.--", "")  # The total size is not known.
+            percentage = 0.0
+
+        eta = str(timedelta(seconds=d["eta"])) if d.get("eta") is not None else "N/A"
+        if d.get("speed") is not None:
+            speed_tmp = size_converter(d["speed"], 1000)  # Set it to 1000 because the unit is `bits` not `bytes`.
+            speed = f" | {speed_tmp[0]}{speed_tmp[1].lower()}ps"
+
+        else:
+            speed = ""
+
+        return f"[{job_name}] {title} | {dl_size[0]}{dl_size[1]}/{t_size[0]}{t_size[1]} ({percentage}%) [ETA: {eta}{speed}]"
+
+    def render(self):
+        """
+        Make the lines of the dashboard.
+
+        :returns list: The lines to show.
+        """
+
+        lines = []
+        total_speed = 0
+        with self._lock:
+            titles = dict(self.titles)
+
+        for job_name in sorted(titles):
+            d = self.events.get(job_name)
+            if d is not None and d["status"] == "downloading":
+                total_speed += d.get("speed") or 0
+
+            lines.append(self._job_line(job_name, titles[job_name], d))
+
+        speed = size_converter(total_speed, 1000)
+        queued = self.queue_depth() if self.queue_depth is not None else 0
+        postprocessing = self.postprocessing() if self.postprocessing is not None else 0
+        lines.append(f"[i] {len(titles)} active | {speed[0]}{speed[1].lower()}ps total | {queued} queued | {postprocessing} post-processing | {self.finished} done")
+        return lines
+
+    def _render_loop(self):
+        """
+        Redraw the dashboard until stop() is called.
+        """
+
+        while not self._stop.wait(1 / info.progress_refresh_rate):
+            width = shutil.get_terminal_size().columns - 1
+            lines = [line[:width] for line in self.render()]
+            with self._lock:
+                if not self._line_start:
+                    continue  # Do not draw in the middle of a printed line.
+
+                self._clear()
+                self.stream.write(''.join(line + '\n' for line in lines))
+                self.stream.flush()
+                self._drawn_lines = len(lines)
+
+    def _plain_loop(self):
+        """
+        Print the lines of the dashboard until stop() is called, when they cannot be redrawn.
+        """
+
+        while not self._stop.wait(info.plain_progress_interval):
+            if len(self.titles) == 0:
+                continue  # Nothing is downloading.
+
+            self.stream.write(''.join(line + '\n' for line in self.render()))
+            self.stream.flush()
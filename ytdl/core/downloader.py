@@ -26,30 +26,77 @@ For more information, please refer to <https://unlicense.org>
 """
 
 import os
+import queue
+import collections
+import threading
 import traceback
-
-import youtube_dl
+import multiprocessing
+import concurrent.futures
 
 from core import info
+from core import urls
+from core import cache
+from core import archive
+from core import report
+from core import metrics
+from core import session
+from core import partials
+from core import manifest
+from core import finalize
+from core import dashboard
 from core.hook import YTDLHook
 
 
+def make_postprocessing_pool():
+    """
+    Create the process pool that post-processes the downloads.
+
+    :returns class: A ProcessPoolExecutor() object.
+    """
+
+    # FFmpeg is CPU-bound, so use as many processes as there are CPUs. Processes
+    # are spawned instead of forked since the other threads may be holding locks.
+    return concurrent.futures.ProcessPoolExecutor(os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+
+
 class Downloader():
     """
     The class that handles youtube_dl calls.
     """
 
-    def __init__(self, url: list, logger, download_path: str, temp_dl_path: str, debug: bool = False, simulate: bool = False, cookie_filepath: str = None):
+    def __init__(self, url: list, logger, download_path: str, temp_dl_path: str, debug: bool = False, simulate: bool = False, cookie_filepath: str = None, jobs: int = 1, prefetch: int = 2, connections: int = 1, cache_ttl: int = info.info_cache_ttl, format_cache_ttl: int = info.format_cache_ttl, run_report = None, run_metrics = None, fsync: str = "file", journal = None, partial_max_age: int = info.partial_max_age, partial_budget: int = 0, download_archive = None, postprocessing_pool = None):
         """
         The initialization method of Downloader() class.
 
-        :param list url: A list of URLs of the YouTube videos/playlists to download.
+        :param list url: A list (or a generator) of URLs of the YouTube videos/playlists to download.
         :param class logger: The logger class.
         :param bool debug: Debug mode.
         :param bool simulate: Do not download the video files.
         :param str cookie_filepath: The filepath of the cookie file to use.
+        :param int jobs: The number of URLs to download at the same time.
+        :param int prefetch: The number of URLs to extract ahead of the downloads.
+        :param int connections: The number of connections used to download each file.
+        :param int cache_ttl: How long (in seconds) extracted info is cached. (0 disables the cache.)
+        :param int format_cache_ttl: How long (in seconds) cached info can be used for downloading.
+        :param class run_report: The RunReport() object where the timings are collected. (Optional)
+        :param class run_metrics: The Metrics() object where the counters are collected. (Optional)
+        :param str fsync: How the finished files are synced to the disk. (See `finalize.fsync_policies`.)
+        :param class journal: The Journal() object where the state of every URL is recorded. (Optional)
+        :param int partial_max_age: Remove partial downloads older than this. (In seconds, 0 keeps them regardless of age.)
+        :param int partial_budget: The total size (in bytes) partial downloads can use. (0 means no limit.)
+        :param class download_archive: The DownloadArchive() object to use instead of loading it again. (Optional)
+        :param class postprocessing_pool: The process pool to post-process with, made by `make_postprocessing_pool()`. (Optional)
         """
 
+        if jobs < 1:
+            raise ValueError("The number of jobs must be at least 1.")
+
+        if prefetch < 1:
+            raise ValueError("The number of URLs to prefetch must be at least 1.")
+
+        if connections < 1:
+            raise ValueError("The number of connections must be at least 1.")
+
         self.url = url
         self.debug = debug
         # Old method: self.download_path = SettingsHandler().get("downloads_path")
@@ -58,6 +105,599 @@ class Downloader():
         self.temp_dl_path = temp_dl_path
         self.simulate = simulate
         self.cookie_filepath = cookie_filepath
+        self.jobs = jobs
+        self.prefetch = prefetch
+        self.connections = connections
+        self.archive = download_archive or archive.DownloadArchive(os.path.join(self.download_path, info.archive_file), self.logger)
+        self.postprocessing_pool = postprocessing_pool
+        if cache_ttl > 0:
+            self.cache = cache.InfoCache(os.path.join(self.temp_dl_path, info.cache_dir), cache_ttl, format_cache_ttl, self.logger)
+
+        else:
+            self.cache = None
+
+        self.finalizer = finalize.Finalizer(self.logger, fsync)
+        self.dashboard = dashboard.Dashboard(self.logger)
+        self.manifests = {}  # The Manifest() of the URL that each job is downloading, by the job names.
+        self._scheduled = set()  # The archive keys of the videos scheduled in this run. (See `_schedule()`.)
+        self._scheduled_lock = threading.Lock()
+        self.run_report = run_report or report.RunReport(self.logger)
+        self.run_metrics = run_metrics or metrics.Metrics(self.logger)
+        self.run_report.add_listener(self.run_metrics.report_event)
+        self.journal = journal
+        self.partial_max_age = partial_max_age
+        self.partial_budget = partial_budget
+
+    def _run(self, media: str, ydl_session):
+        """
+        Download every URL in <self.url> using a pipeline.
+
+        The prefetch stage extracts the info of the next URLs while the download
+        stage is still downloading the previous ones. Both stages use <self.jobs>
+        threads, and at most <self.prefetch> extracted URLs are kept waiting in
+        between. Downloaded URLs are post-processed by a process pool, and then
+        moved to <self.download_path> by the finalize stage.
+
+        Playlists are listed without extracting their entries, and each entry
+        is then scheduled as a separate URL right after the playlist.
+
+        <self.url> can be a generator (e.g., `urls.read_urls()`). It is read by
+        the ingest thread, which keeps at most <self.prefetch> URLs waiting,
+        so a slow source (e.g., the standard input) never blocks the workers.
+
+        :param str media: The type of media to download. (video or audio)
+        :param class ydl_session: The Session() object that holds the YoutubeDL objects.
+
+        :returns dict: A dictionary with 3 tuples (success, failed, and skipped) that contain tuples with two strings for urls and titles.
+                       (Failed tuples can have a third string, the error message.)
+        """
+
+        removed, removed_bytes = partials.collect_garbage(self.temp_dl_path, self.partial_max_age, self.partial_budget, self.logger)
+        if removed > 0:
+            print(f"[i] Removed {removed} stale partial downloads. ({dashboard.size_converter(removed_bytes)})")
+
+        if self.cache is not None:
+            self.cache.sweep()
+
+        incoming = collections.deque()  # URLs that are read from <self.url> but not prefetched yet.
+        pending = collections.deque()  # Playlist entries that are not prefetched yet.
+        pending_changed = threading.Condition()
+        prefetch_state = {"active": 0, "exhausted": False, "resumed": 0}
+        prefetched = queue.Queue(maxsize=self.prefetch)
+        # Downloaded URLs that are waiting for their post-processing. The bound stops the
+        # downloads from piling up in the temporary directory while the post-processing lags.
+        finished = queue.Queue(maxsize=self.jobs)
+        url_results = {}
+
+        def ingest_stage():
+            try:
+                for index, url in enumerate(self.url):
+                    if self.journal is not None and self.journal.is_finished(media, url):
+                        with pending_changed:
+                            prefetch_state["resumed"] += 1
+
+                        continue  # Finished in an earlier run.
+
+                    self._journal(media, url, "queued")
+                    with pending_changed:
+                        while len(incoming) >= self.prefetch:
+                            pending_changed.wait()
+
+                        incoming.append(((index,), url, None))
+                        pending_changed.notify_all()
+
+            except Exception as e:
+                print()
+                print("[E] Cannot read the URLs:", e)
+                self.logger.error(f"Cannot read the URLs: {e}")
+
+            finally:
+                with pending_changed:
+                    prefetch_state["exhausted"] = True
+                    pending_changed.notify_all()
+
+        def next_url():
+            with pending_changed:
+                while True:
+                    if len(pending) > 0:
+                        item = pending.popleft()
+                        if self.journal is not None and self.journal.is_finished(media, item[1]):
+                            prefetch_state["resumed"] += 1
+                            continue  # A playlist entry that was finished in an earlier run.
+
+                        break
+
+                    if len(incoming) > 0:
+                        item = incoming.popleft()
+                        pending_changed.notify_all()  # The ingest thread can read the next URL.
+                        break
+
+                    if prefetch_state["exhausted"] and prefetch_state["active"] == 0:
+                        return None  # No other worker can add more playlist entries.
+
+                    pending_changed.wait()
+
+                prefetch_state["active"] += 1
+                return item
+
+        def prefetch_stage():
+            while True:
+                item = next_url()
+                if item is None:
+                    return
+
+                index, url, entry = item
+                entries = []
+                record = self.run_report.start_item(url, media)
+                try:
+                    listed_entries = self.journal.entries(media, url) if self.journal is not None else None
+                    if listed_entries is not None:
+                        # The playlist was listed in an earlier run, so it is not extracted again.
+                        self.run_report.finish_item(record, ("playlist", (url, "N/A")))
+                        entries = list(listed_entries)
+                        self.logger.info(f"Scheduling {len(entries)} playlist entries from the journal.")
+                        for entry_index, (entry_url, entry) in enumerate(entries):
+                            entries[entry_index] = (index + (entry_index,), entry_url, entry)
+
+                        continue
+
+                    self._journal(media, url, "extracting")
+                    url_info, url_result = self._prefetch(url, entry, ydl_session, record)
+                    if url_result is None and url_info.get("_type", "video") in ("playlist", "multi_video"):
+                        entries = self._playlist_entries(url_info)
+                        self.run_report.finish_item(record, ("playlist", (url, url_info.get("title", "N/A"))), url_info)
+                        self._journal(media, url, "listed", entries)
+                        print()
+                        print(f"[*] Found {len(entries)} videos in `{url_info.get('title', 'N/A')}`.")
+                        self.logger.info(f"Scheduling {len(entries)} playlist entries.")
+                        for entry_index, (entry_url, entry) in enumerate(entries):
+                            entries[entry_index] = (index + (entry_index,), entry_url, entry)
+
+                    else:
+                        prefetched.put((index, url, record, (url_info, url_result)))
+
+                except Exception as e:
+                    # Keep the worker alive for the other URLs, and give this one a result.
+                    print()
+                    print(f"[E] Cannot prefetch `{url}`:", e)
+                    self.logger.error(f"Prefetching `{url}` failed: {e}")
+                    self.logger.debug('\n' + traceback.format_exc())
+                    entries = []
+                    prefetched.put((index, url, record, (None, ("failed", (url, "N/A", str(e))))))
+
+                finally:
+                    with pending_changed:
+                        # Put the entries in front of the other URLs so that
+                        # the first video of a playlist is downloaded early.
+                        pending.extendleft(reversed(entries))
+                        prefetch_state["active"] -= 1
+                        pending_changed.notify_all()
+
+        def download_stage():
+            while True:
+                item = prefetched.get()
+                if item is None:
+                    return
+
+                index, url, record, (url_info, url_result) = item
+                future = None
+                item_manifest = None
+                if url_result is None:
+                    job_name = threading.current_thread().name
+                    try:
+                        item_manifest = self.manifests[job_name] = manifest.Manifest()
+                        self.dashboard.begin(job_name, url_info.get("title", "N/A"))
+                        self._journal(media, url, "downloading")
+                        url_result, postprocessing_args = self._download(url, url_info, media, ydl_session, record)
+                        if postprocessing_args is not None:
+                            # Start the next download while this one is post-processed.
+                            self._journal(media, url, "postprocessing")
+                            future = postprocessing_pool.submit(session.run_postprocessing, *postprocessing_args)
+
+                    except Exception as e:
+                        # The item must still reach the finalize stage, or the run never ends.
+                        print()
+                        print(f"[E] Downloading `{url_info.get('title', 'N/A')}` failed:", e)
+                        self.logger.error(f"Download or post-processing submission failed: {e}")
+                        self.logger.debug('\n' + traceback.format_exc())
+                        url_result = ("failed", (url, url_info.get("title", "N/A"), str(e)))
+                        future = None
+
+                    finally:
+                        self.dashboard.end(job_name)
+                        self.manifests.pop(job_name, None)
+
+                finished.put((index, url, record, url_info, url_result, item_manifest, future))
+
+        def finalize_stage():
+            while True:
+                item = finished.get()
+                if item is None:
+                    return
+
+                index, url, record, url_info, url_result, item_manifest, future = item
+                if future is not None:
+                    try:
+                        seconds, postprocessed_files = future.result()
+                        self.run_report.add_phase(record, "postprocess", seconds)
+                        for files in postprocessed_files:
+                            item_manifest.update(files)
+
+                    except Exception as e:
+                        print()
+                        print(f"[E] Post-processing `{url_info.get('title', 'N/A')}` failed:", e)
+                        self.logger.error(f"Post-processing failed: {e}")
+                        url_result = ("failed", (url, url_info.get("title", "N/A"), f"Post-processing failed: {e}"))
+
+                if url_result[0] == "success":
+                    try:
+                        self._finalize(url_info, record, item_manifest)
+
+                    except Exception as e:
+                        print()
+                        print(f"[E] Cannot move the files of `{url_info.get('title', 'N/A')}`:", e)
+                        self.logger.error(f"Cannot move the downloaded files: {e}")
+                        self.logger.debug('\n' + traceback.format_exc())
+                        url_result = ("failed", (url, url_info.get("title", "N/A"), f"Cannot move the files: {e}"))
+
+                self.run_report.finish_item(record, url_result, url_info)
+                error = url_result[1][2] if len(url_result[1]) > 2 else None
+                self._journal(media, url, {"success": "done", "skipped": "skipped", "failed": "failed"}[url_result[0]], error=error)
+                url_results[index] = url_result
+
+        self.logger.info(f"Starting {self.jobs} prefetch and {self.jobs} download workers.")
+        ingest_worker = threading.Thread(target=ingest_stage, name="ingest", daemon=True)
+        prefetch_workers = [threading.Thread(target=prefetch_stage, name=f"prefetch_{i}", daemon=True) for i in range(self.jobs)]
+        download_workers = [threading.Thread(target=download_stage, name=f"job_{i}", daemon=True) for i in range(self.jobs)]
+        finalize_worker = threading.Thread(target=finalize_stage, name="finalize", daemon=True)
+        postprocessing_pool = self.postprocessing_pool or make_postprocessing_pool()
+        self.dashboard.queue_depth = lambda: prefetched.qsize() + len(pending) + len(incoming)
+        self.dashboard.postprocessing = finished.qsize
+        self.run_metrics.set_gauge("queue_depth", self.dashboard.queue_depth)
+        self.run_metrics.set_gauge("active_jobs", lambda: len(self.dashboard.titles))
+        self.run_metrics.set_gauge("postprocessing", finished.qsize)
+        self.dashboard.start()
+        try:
+            for worker in [ingest_worker] + prefetch_workers + download_workers + [finalize_worker]:
+                worker.start()
+
+            for worker in prefetch_workers:
+                worker.join()
+
+            self.logger.info("All URLs are prefetched, stopping the download workers.")
+            for _ in download_workers:
+                prefetched.put(None)
+
+            for worker in download_workers:
+                worker.join()
+
+            self.logger.info("All URLs are downloaded, waiting for the post-processing to finish.")
+            finished.put(None)
+            finalize_worker.join()
+
+        finally:
+            self.dashboard.stop()
+            if postprocessing_pool is not self.postprocessing_pool:
+                postprocessing_pool.shutdown()
+
+        if prefetch_state["resumed"] > 0:
+            print()
+            print(f"[i] Skipped {prefetch_state['resumed']} URLs that were finished in an earlier run.")
+            self.logger.info(f"Skipped {prefetch_state['resumed']} URLs that are finished in the journal.")
+
+        result = {"success": [], "failed": [], "skipped": []}
+        for index in sorted(url_results):  # Keep the same order as <self.url>.
+            status, item = url_results[index]
+            result[status].append(item)
+
+        return result
+
+    def _journal(self, media: str, url: str, state: str, entries: list = None, error: str = None):
+        """
+        Record the new state of a URL in the journal, if there is one.
+
+        :param str media: The type of media to download.
+        :param str url: The URL.
+        :param str state: The new state of the URL. (See `journal.states`.)
+        :param list entries: The entries of a listed playlist. (Optional)
+        :param str error: Why the URL failed. (Optional)
+        """
+
+        if self.journal is not None:
+            self.journal.record(media, url, state, entries, error)
+
+    def _hook(self):
+        """
+        Create a progress hook for the current worker.
+
+        :returns class: A YTDLHook() object.
+        """
+
+        return YTDLHook(self.logger, self.dashboard, self.run_report, self.run_metrics, self.manifests, threading.current_thread().name)
+
+    def _is_downloaded(self, url_info: dict):
+        """
+        Check if the video described by <url_info> is in the download archive.
+
+        :param dict url_info: The info dict returned by youtube_dl.
+
+        :returns bool: True if the video is already downloaded.
+        """
+
+        if url_info.get("_type", "video") != "video":
+            return False  # Playlist entries are checked by `self._match_filter()`.
+
+        return self.archive.contains(url_info["extractor_key"], url_info["id"])
+
+    def _schedule(self, extractor: str, video_id: str):
+        """
+        Mark a video as scheduled for download in this run.
+
+        Overlapping playlists, or a playlist and a direct URL, can contain the
+        same video. The archive only knows it after the first download is
+        finished, so without this two jobs would download it into the same
+        `.part` file at the same time.
+
+        :param str extractor: The extractor key. (e.g., `Youtube`)
+        :param str video_id: The ID of the video.
+
+        :returns bool: False if the video was already scheduled.
+        """
+
+        key = archive.DownloadArchive.make_key(extractor, video_id)
+        with self._scheduled_lock:
+            if key in self._scheduled:
+                return False
+
+            self._scheduled.add(key)
+            return True
+
+    def _cached_info(self, extractor: str, video_id: str):
+        """
+        Get the cached info dict of a video.
+
+        :param str extractor: The extractor key. (e.g., `Youtube`)
+        :param str video_id: The ID of the video.
+
+        :returns dict: The cached info dict, or None if there is none.
+        """
+
+        if self.cache is None:
+            return None
+
+        # Simulations do not download anything, so expired format URLs do not matter.
+        return self.cache.get(extractor, video_id, need_formats=not self.simulate)
+
+    def _playlist_entries(self, url_info: dict):
+        """
+        Get the URLs of the entries of a flat playlist.
+
+        :param dict url_info: The info dict of the playlist, extracted with `extract_flat`.
+
+        :returns list: A list of tuples of the URL of each entry and its extractor, ID, and title. (The tuple is None if they are not known.)
+        """
+
+        entries = []
+        for entry in url_info.get("entries") or []:
+            if entry is None:
+                continue
+
+            entry_url = entry.get("url") or entry.get("webpage_url")
+            if entry.get("_type", "video") == "video":
+                # The extractor returned the full info dict of the entry.
+                entry_url = entry.get("webpage_url") or entry_url
+
+            else:
+                # Flat entries may only have the ID, which the extractor in `ie_key` accepts.
+                entry_url = entry_url or entry.get("id")
+                if entry.get("ie_key") == "Youtube" and entry_url is not None and "://" not in entry_url:
+                    entry_url = f"https://www.youtube.com/watch?v={entry_url}"
+
+            if entry_url is None:
+                # e.g., deleted or private videos
+                self.logger.warning(f"Skipping a playlist entry without a URL or an ID: `{entry.get('title', 'N/A')}`")
+                continue
+
+            extractor = entry.get("ie_key") or entry.get("extractor_key")
+            if extractor is not None and entry.get("id") is not None:
+                entries.append((entry_url, (extractor, entry["id"], entry.get("title"))))
+
+            else:
+                entries.append((entry_url, None))
+
+        return entries
+
+    def _match_filter(self, info_dict: dict):
+        """
+        The `match_filter` of youtube_dl. Skips playlist entries that are already downloaded.
+
+        :param dict info_dict: The info dict of the video that youtube_dl is about to download.
+
+        :returns str: The reason why the video is skipped, or None if it should be downloaded.
+        """
+
+        if self._is_downloaded(info_dict):
+            self.logger.warning(f"Skipping `{info_dict['id']}` since it is already downloaded.")
+            return f"{info_dict.get('title', info_dict['id'])} is already downloaded."
+
+        return None
+
+    def _record_download(self, url_info: dict):
+        """
+        Add the videos described by <url_info> to the download archive.
+
+        :param dict url_info: The info dict returned by youtube_dl.
+        """
+
+        for entry in url_info.get("entries") or [url_info]:
+            if entry is not None and entry.get("_type", "video") == "video":
+                self.archive.add(entry["extractor_key"], entry["id"])
+
+    def _download_info(self, ydl, url_info: dict):
+        """
+        Download the media described by an info dict that was already extracted.
+
+        :param class ydl: The YoutubeDL object to use.
+        :param dict url_info: The info dict returned by `ydl.extract_info(url, download=False)`.
+
+        :returns int: The return code of youtube_dl. (0 means success)
+        """
+
+        # This is what `YoutubeDL.download_with_info_file()` does, which
+        # lets us download without running the extractor a second time.
+        ydl.process_ie_result(ydl.filter_requested_info(url_info), download=True)
+        return ydl._download_retcode
+
+    def _prefetch(self, url: str, entry: tuple, ydl_session, record: dict):
+        """
+        Extract the info of <url> and check if it is already downloaded.
+
+        :param str url: The URL of the YouTube video/playlist.
+        :param tuple entry: The extractor, ID, and title of the video if they are already known. (e.g., playlist entries)
+        :param class ydl_session: The Session() object that holds the YoutubeDL objects.
+        :param dict record: The run report record of <url>.
+
+        :returns tuple: The info dict of <url> and its result. The result is None if <url> still needs to be downloaded.
+        """
+
+        ie_key = None
+        title = None
+        if entry is None:
+            self.logger.info("Checking if the video ID in the URL is already downloaded.")
+            video_id = urls.youtube_id(url)
+            if video_id is not None:
+                entry = ("Youtube", video_id, None)
+
+        else:
+            ie_key = entry[0]
+
+        url_info = None
+        if entry is not None:
+            extractor, video_id, title = entry
+            record["id"] = video_id
+            with self.run_report.phase(record, "skip-check"):
+                downloaded = self.archive.contains(extractor, video_id)
+
+            if downloaded:
+                print()
+                print(f"[!] `{title or url}` is already downloaded.")
+                self.logger.warning("Skipping URL since it is already downloaded. (ID found without extracting)")
+                return None, ("skipped", (url, title or "N/A"))
+
+            if not self._schedule(extractor, video_id):
+                print()
+                print(f"[!] `{title or url}` is already scheduled in this run.")
+                self.logger.warning(f"Skipping `{video_id}` since it is already scheduled in this run.")
+                return None, ("skipped", (url, title or "N/A"))
+
+            with self.run_report.phase(record, "cache"):
+                url_info = self._cached_info(extractor, video_id)
+
+        if url_info is None:
+            self.logger.info("Extracting URL info...")
+            try:
+                with self.run_report.phase(record, "extract"):
+                    url_info = ydl_session.get().extract_info(url, download=False, ie_key=ie_key)
+                    if self.cache is not None:
+                        self.cache.put(url_info)
+
+            except Exception as e:
+                print("[E] A YouTube-DL error occured:", e)
+                self.logger.error("A YouTube-DL error occured: {0}".format(e))
+                self.logger.debug('\n' + traceback.format_exc())
+                return None, ("failed", (url, title or "N/A"))
+
+        self.logger.info("Checking if file is already downloaded using the download archive.")
+        with self.run_report.phase(record, "skip-check"):
+            downloaded = self._is_downloaded(url_info)
+
+        if downloaded:
+            print()
+            print(f"[!] `{url_info.get('title', 'N/A')}` (ID: {url_info.get('id', 'N/A')}) is already downloaded.")
+            self.logger.warning("Skipping URL since it is already downloaded. (ID found in the download archive)")
+            return url_info, ("skipped", (url, url_info.get("title", "N/A")))
+
+        if entry is None and url_info.get("_type", "video") == "video" and not self._schedule(url_info["extractor_key"], url_info["id"]):
+            # The ID was not known before extracting. (e.g., a URL that is not from YouTube)
+            print()
+            print(f"[!] `{url_info.get('title', 'N/A')}` (ID: {url_info['id']}) is already scheduled in this run.")
+            self.logger.warning(f"Skipping `{url_info['id']}` since it is already scheduled in this run.")
+            return url_info, ("skipped", (url, url_info.get("title", "N/A")))
+
+        return url_info, None
+
+    def _download(self, url: str, url_info: dict, media: str, ydl_session, record: dict):
+        """
+        Download the media of a prefetched URL.
+
+        :param str url: The URL of the YouTube video/playlist.
+        :param dict url_info: The info dict of <url>.
+        :param str media: The type of media to download. (video or audio)
+        :param class ydl_session: The Session() object that holds the YoutubeDL objects.
+        :param dict record: The run report record of <url>.
+
+        :returns tuple: The result key (success, failed, or skipped) and a tuple of the url and title,
+                        and the arguments of `session.run_postprocessing()`. (None if there is nothing to post-process)
+        """
+
+        print()
+        print(f"[*] Downloading {media} `{url_info.get('title', 'N/A')}` (ID: {url_info.get('id', 'N/A')})...")
+        self.logger.info("Starting youtube_dl.")
+        try:
+            job_name = threading.current_thread().name
+            ydl = ydl_session.get()
+            self.run_report.begin_transfer(job_name, record)
+            try:
+                retcode = self._download_info(ydl, url_info)
+
+            finally:
+                self.run_report.end_transfer(job_name)
+                # Always take the post-processing jobs, so they are not left for the next URL.
+                postprocessing_args = ydl_session.postprocessing_args(ydl)
+
+            if retcode == 0:
+                self.logger.info("Download success.")
+                return ("success", (url, url_info.get("title", "N/A"))), postprocessing_args
+
+            else:
+                self.logger.error("Download failed.")
+                return ("failed", (url, url_info.get("title", "N/A"))), None
+
+        except Exception as e:
+            print("[E] A YouTube-DL error occured:", e)
+            self.logger.error("A YouTube-DL error occured: {0}".format(e))
+            self.logger.debug('\n' + traceback.format_exc())
+            return ("failed", (url, url_info.get("title", "N/A"))), None
+
+    def _finalize(self, url_info: dict, record: dict, item_manifest):
+        """
+        Move the files of a downloaded and post-processed URL to <self.download_path>.
+
+        :param dict url_info: The info dict of the URL.
+        :param dict record: The run report record of the URL.
+        :param class item_manifest: The Manifest() of the files that the URL produced.
+        """
+
+        if self.simulate:
+            self.logger.info("Simulation only, skipping file movement process.")
+            return
+
+        self.logger.info("Checking files to move.")
+        with self.run_report.phase(record, "move"):
+            produced_files = item_manifest.files
+            if len(produced_files) == 0:
+                raise FileNotFoundError("YouTube-DL did not produce any files.")
+
+            self.logger.info(f"{len(produced_files)} files to move.")
+            for produced_file in produced_files:
+                self.finalizer.move(produced_file, os.path.join(self.download_path, os.path.basename(produced_file)))
+
+            for partial_file in item_manifest.partial_files:
+                self.logger.info(f"Removing the partial file `{partial_file}`.")
+                os.remove(partial_file)
+
+        self.logger.info("Files moved.")
+        self._record_download(url_info)
 
     def video(self, embed_subs: bool = True, no_audio: bool = False, quality_override: bool = False, no_overwrites: bool = True):
         """
@@ -81,88 +721,40 @@ class Downloader():
             return result
 
         else:
-            self.logger.info(f"Downloading from {len(self.url)} URLs...")
-            for url in self.url:
-                self.logger.info("Setting YouTube-DL options.")
-                ydl_opts = {
-                    "logger": self.logger,
-                    "postprocessors": [
-                        {
-                            "key": "FFmpegEmbedSubtitle"
-                        },
-                        {
-                            "key": "FFmpegMetadata"
-                        }
-                    ],
-                    "progress_hooks": [YTDLHook(self.logger).main],
-                    "verbose": self.debug,
-                    "nooverwrites": no_overwrites,
-                    "simulate": self.simulate,
-                    "debug_printtraffic": self.debug,
-                    "outtmpl": os.path.join(self.temp_dl_path, "%(title)s - %(id)s.%(ext)s")
-                }
-
-                if embed_subs:
-                    ydl_opts["writesubtitles"] = True
-                    ydl_opts["allsubtitles"] = True
-
-                if no_audio:
-                    ydl_opts["format"] = "bestvideo"
-
-                else:
-                    ydl_opts["format"] = "bestvideo+bestaudio/best"
-
-                if self.cookie_filepath is not None:
-                    ydl_opts["cookiefile"] = self.cookie_filepath
-
-                self.logger.info("Extracting URL info...")
-                url_info = youtube_dl.YoutubeDL(ydl_opts).extract_info(url, download=False)
-
-                print()
-                print(f"[*] Downloading video `{url_info.get('title', 'N/A')}` (ID: {url_info.get('id', 'N/A')})")
-                self.logger.info("Checking if file is already downloaded using its ID.")
-                skip_url = False
-                for f in os.listdir(self.download_path):
-                    if url_info["id"] in f:
-                        self.logger.warning("File is already downloaded. (ID detected on filename)")
-                        print("[!] File is already downloaded.")
-                        skip_url = True
-                        break
-
-                if skip_url:
-                    self.logger.warning("Skipping URL since it is already downloaded.")
-                    result["skipped"].append((url, url_info.get("title", "N/A")))
-                    continue
-
-                self.logger.info("Starting youtube_dl.")
-                try:
-                    if youtube_dl.YoutubeDL(ydl_opts).download([url]) == 0:
-                        self.logger.info("Download success.")
-                        result["success"].append((url, url_info.get("title", "N/A")))
-                        # Get all files with the same name
-                        matched_files = []
-                        if not self.simulate:
-                            self.logger.info("Checking files to move.")
-                            for f in os.listdir(self.temp_dl_path):
-                                if f"- {url_info['id']}" in f:
-                                    matched_files.append(f)
-
-                            self.logger.info(f"{len(matched_files)} files to move.")
-                            for f in matched_files:
-                                os.rename(os.path.join(self.temp_dl_path, f), os.path.join(self.download_path, f))
-
-                        else:
-                            self.logger.info("Simulation only, skipping file movement process.")
-
-                    else:
-                        self.logger.error("Download failed.")
-                        result["failed"].append((url, url_info.get("title", "N/A")))
-
-                except Exception as e:
-                    print("[E] A YouTube-DL error occured:", e)
-                    self.logger.error("A YouTube-DL error occured: {0}".format(e))
-                    self.logger.debug('\n' + traceback.format_exc())
-                    result["failed"].append((url, url_info.get("title", "N/A")))
+            self.logger.info("Setting YouTube-DL options.")
+            ydl_opts = {
+                "logger": self.logger,
+                "postprocessors": [
+                    {
+                        "key": "FFmpegFusedVideo",  # Merges, embeds the subtitles and adds the metadata in one pass.
+                        "embed_subs": embed_subs
+                    }
+                ],
+                "verbose": self.debug,
+                "nooverwrites": no_overwrites,
+                "simulate": self.simulate,
+                "debug_printtraffic": self.debug,
+                "extract_flat": "in_playlist",  # Playlist entries are extracted one by one.
+                "match_filter": self._match_filter,
+                "range_connections": self.connections,  # See `ranges.RangeFD()`.
+                "outtmpl": os.path.join(self.temp_dl_path, "%(title)s - %(id)s.%(ext)s")
+            }
+
+            if embed_subs:
+                ydl_opts["writesubtitles"] = True
+                ydl_opts["allsubtitles"] = True
+
+            if no_audio:
+                ydl_opts["format"] = "bestvideo"
+
+            else:
+                ydl_opts["format"] = "bestvideo+bestaudio/best"
+
+            if self.cookie_filepath is not None:
+                ydl_opts["cookiefile"] = self.cookie_filepath
+
+            self.logger.info("Downloading from the URL list...")
+            result = self._run("video", session.Session(ydl_opts, self.logger, self._hook))
 
             self.logger.info("Returning result...")
             return result
@@ -187,88 +779,95 @@ class Downloader():
             return result
 
         else:
-            self.logger.info(f"Downloading from {len(self.url)} URLs...")
-            for url in self.url:
-                self.logger.info("Setting up YouTube-DL options.")
-                ydl_opts = {
-                    "format": "bestaudio",
-                    "postprocessors": [
-                        {
-                            "key": "FFmpegExtractAudio",
-                            "preferredcodec": "mp3"
-                        },
-                        {
-                            "key": "FFmpegSubtitlesConvertor",
-                            "format": "lrc"
-                        },
-                        {
-                            "key": "FFmpegMetadata"
-                        }
-                    ],
-                    "logger": self.logger,
-                    "verbose": self.debug,
-                    "progress_hooks": [YTDLHook(self.logger).main],
-                    "nooverwrites": no_overwrites,
-                    "simulate": self.simulate,
-                    "debug_printtraffic": self.debug,
-                    "outtmpl": os.path.join(self.temp_dl_path, "%(title)s - %(id)s.%(ext)s")
-                }
-
-                if not no_lyrics:
-                    ydl_opts["writesubtitles"] = True
-                    ydl_opts["allsubtitles"] = True
-
-                if self.cookie_filepath is not None:
-                    ydl_opts["cookiefile"] = self.cookie_filepath
-
-                self.logger.info("Fetching url information.")
-                url_info = youtube_dl.YoutubeDL(ydl_opts).extract_info(url, download=False)
-
-                print()
-                print(f"[*] Downloading audio `{url_info.get('title', 'N/A')}` (ID: {url_info.get('id', 'N/A')})...")
-                self.logger.info("Checking if file is already downloaded using its ID.")
-                skip_url = False
-                for f in os.listdir(self.download_path):
-                    if url_info["id"] in f:
-                        self.logger.warning("File is already downloaded. (ID detected on filename)")
-                        print("[!] File is already downloaded.")
-                        skip_url = True
-                        break
-
-                if skip_url:
-                    self.logger.warning("Skipping URL since it is already downloaded.")
-                    result["skipped"].append((url, url_info.get("title", "N/A")))
-                    continue
+            self.logger.info("Setting up YouTube-DL options.")
+            ydl_opts = {
+                "format": "bestaudio",
+                "postprocessors": [
+                    {
+                        "key": "FFmpegFusedAudio",  # Extracts the audio and adds the metadata in one pass.
+                        "preferredcodec": "mp3"
+                    },
+                    {
+                        "key": "FFmpegSubtitlesConvertor",
+                        "format": "lrc"
+                    }
+                ],
+                "logger": self.logger,
+                "verbose": self.debug,
+                "nooverwrites": no_overwrites,
+                "simulate": self.simulate,
+                "debug_printtraffic": self.debug,
+                "extract_flat": "in_playlist",  # Playlist entries are extracted one by one.
+                "match_filter": self._match_filter,
+                "range_connections": self.connections,  # See `ranges.RangeFD()`.
+                "outtmpl": os.path.join(self.temp_dl_path, "%(title)s - %(id)s.%(ext)s")
+            }
+
+            if not no_lyrics:
+                ydl_opts["writesubtitles"] = True
+                ydl_opts["allsubtitles"] = True
+
+            if self.cookie_filepath is not None:
+                ydl_opts["cookiefile"] = self.cookie_filepath
+
+            self.logger.info("Downloading from the URL list...")
+            return self._run("audio", session.Session(ydl_opts, self.logger, self._hook))
+
+    def video_audio(self, embed_subs: bool = True, quality_override: bool = False, no_overwrites: bool = True):
+        """
+        Download video and audio from <self.url> in a single pass.
 
-                self.logger.info("Calling youtube_dl.")
-                try:
-                    if youtube_dl.YoutubeDL(ydl_opts).download([url]) == 0:
-                        self.logger.info("Download success.")
-                        result["success"].append((url, url_info.get("title", "N/A")))
-                        # Get all files with the same name
-                        matched_files = []
-                        if not self.simulate:
-                            self.logger.info("Checking files to move.")
-                            for f in os.listdir(self.temp_dl_path):
-                                if f"- {url_info['id']}" in f:
-                                    matched_files.append(f)
-
-                            self.logger.info(f"{len(matched_files)} files to move.")
-                            for f in matched_files:
-                                os.rename(os.path.join(self.temp_dl_path, f), os.path.join(self.download_path, f))
-
-                            self.logger.info("Files moved.")
-
-                        else:
-                            self.logger.info("Simulation only, skipping file movement process.")
+        Each URL is extracted and its streams are downloaded only once.
+        The audio file and lyrics are derived locally from the downloaded audio stream.
 
-                    else:
-                        result["failed"].append((url, url_info.get("title", "N/A")))
+        :param bool embed_subs: Embed the subtitles and convert them to lyrics?
+        :param bool quality_override: Override quality?
+        :param bool no_overwrites: Avoid overwriting file if it already exists.
 
-                except Exception as e:
-                    print("[E] A YouTube-DL error occured:", e)
-                    self.logger.error("A YouTube-DL error occured: {0}".format(e))
-                    self.logger.debug('\n' + traceback.format_exc())
-                    result["failed"].append((url, url_info.get("title", "N/A")))
+        :returns dict: A dictionary with 3 tuples (success, failed, and skipped) that contain tuples with two strings for urls and titles.
+        """
 
+        self.logger.info("Preparing to call youtube_dl...")
+        result = {"success": [], "failed": [], "skipped": []}
+        if quality_override:
+            self.logger.error("quality_override is not yet supported.")
+            print("[!] Not supported yet!")
+            result["failed"] = map(lambda x: (x, "N/A"), self.url)
             return result
+
+        else:
+            self.logger.info("Setting YouTube-DL options.")
+            ydl_opts = {
+                "logger": self.logger,
+                "format": "bestvideo+bestaudio/best",
+                "postprocessors": [
+                    {
+                        "key": "FFmpegFusedVideo",  # Merges, embeds the subtitles and adds the metadata in one pass.
+                        "embed_subs": embed_subs
+                    },
+                    {
+                        "key": "FFmpegAudioFromVideo",
+                        "preferredcodec": "mp3",
+                        "lyrics": embed_subs
+                    }
+                ],
+                "keepvideo": True,  # FFmpegAudioFromVideo needs the audio stream after merging.
+                "verbose": self.debug,
+                "nooverwrites": no_overwrites,
+                "simulate": self.simulate,
+                "debug_printtraffic": self.debug,
+                "extract_flat": "in_playlist",  # Playlist entries are extracted one by one.
+                "match_filter": self._match_filter,
+                "range_connections": self.connections,  # See `ranges.RangeFD()`.
+                "outtmpl": os.path.join(self.temp_dl_path, "%(title)s - %(id)s.%(ext)s")
+            }
+
+            if embed_subs:
+                ydl_opts["writesubtitles"] = True
+                ydl_opts["allsubtitles"] = True
+
+            if self.cookie_filepath is not None:
+                ydl_opts["cookiefile"] = self.cookie_filepath
+
+            self.logger.info("Downloading from the URL list...")
+            return self._run("video and audio", session.Session(ydl_opts, self.logger, self._hook))
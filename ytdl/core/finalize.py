@@ -0,0 +1,207 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+import errno
+import shutil
+
+from core import info
+
+# How the finalized files are synced to the disk.
+# "none": Leave it to the operating system.
+# "file": Sync the contents of each file before it is renamed into place.
+# "all": Also sync the directory after the rename, so that the new name survives a crash.
+fsync_policies = ("none", "file", "all")
+
+# The errors of `os.copy_file_range()` and `os.sendfile()` that mean the copy method is not supported.
+_unsupported_errors = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF)
+
+
+def kernel_copy(source_fd: int, target_fd: int, size: int) -> int:
+    """
+    Copy <size> bytes from <source_fd> to <target_fd> without passing them through Python.
+
+    `os.copy_file_range()` is tried first (which can reflink or copy on the server side
+    for some filesystems), then `os.sendfile()`, then a plain read and write loop.
+    Both file descriptors must be at offset 0, and <target_fd> is left at the end of the copy.
+
+    :param int source_fd: The file descriptor to read from.
+    :param int target_fd: The file descriptor to write to.
+    :param int size: The number of bytes to copy.
+
+    :returns int: The number of bytes copied.
+    """
+
+    offset = 0
+    for copy_method in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+        while copy_method is not None and offset < size:
+            count = min(size - offset, info.copy_block_size)
+            try:
+                if copy_method is getattr(os, "sendfile", None):
+                    copied = os.sendfile(target_fd, source_fd, offset, count)
+
+                else:
+                    copied = copy_method(source_fd, target_fd, count)
+
+            except OSError as e:
+                if e.errno not in _unsupported_errors:
+                    raise
+
+                break
+
+            if copied == 0:
+                break
+
+            offset += copied
+
+    while offset < size:
+        block = os.pread(source_fd, min(size - offset, info.copy_block_size), offset)
+        if not block:
+            break
+
+        offset += os.write(target_fd, block)
+
+    return offset
+
+
+def fsync_directory(path: str):
+    """
+    Sync the entries of the directory <path> to the disk.
+
+    :param str path: The path of the directory.
+    """
+
+    if os.name == "nt":
+        return  # Directories cannot be opened on Windows.
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+
+    finally:
+        os.close(fd)
+
+
+class Finalizer():
+    """
+    Move finished files to the downloads folder.
+
+    Files on the same filesystem are renamed. Files on another filesystem
+    (e.g., a tmpfs temporary folder and a NAS downloads folder) are copied
+    by the kernel to a hidden temporary name next to the destination, then
+    renamed into place, so that the downloads folder never has partial files.
+    """
+
+    def __init__(self, logger, fsync: str = "file"):
+        """
+        The initialization method of Finalizer() class.
+
+        :param class logger: The logger class.
+        :param str fsync: How the files are synced to the disk. (See `fsync_policies`.)
+        """
+
+        if fsync not in fsync_policies:
+            raise ValueError(f"The fsync policy must be one of {', '.join(fsync_policies)}.")
+
+        self.logger = logger
+        self.fsync = fsync
+        self._devices = {}  # The device IDs of the directories, by their paths.
+
+    def _device(self, path: str) -> int:
+        """
+        Get the device ID of the directory <path>.
+
+        :param str path: The path of the directory.
+
+        :returns int: The device ID.
+        """
+
+        device = self._devices.get(path)
+        if device is None:
+            device = self._devices[path] = os.stat(path).st_dev
+
+        return device
+
+    def move(self, source: str, target: str):
+        """
+        Move the file <source> to <target>, replacing it if it exists.
+
+        :param str source: The path of the file to move.
+        :param str target: The new path of the file.
+        """
+
+        target_dir = os.path.dirname(target) or os.curdir
+        if self._device(os.path.dirname(source) or os.curdir) == self._device(target_dir):
+            if self.fsync != "none":
+                with open(source, "rb") as f:
+                    os.fsync(f.fileno())
+
+            try:
+                os.replace(source, target)
+
+            except OSError as e:
+                if e.errno != errno.EXDEV:  # Different filesystems on the same device. (e.g., bind mounts)
+                    raise
+
+                self._copy(source, target)
+
+        else:
+            self._copy(source, target)
+
+        if self.fsync == "all":
+            fsync_directory(target_dir)
+
+    def _copy(self, source: str, target: str):
+        """
+        Move the file <source> to another filesystem by copying it.
+
+        :param str source: The path of the file to move.
+        :param str target: The new path of the file.
+        """
+
+        temp_target = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.{os.getpid()}.tmp")
+        self.logger.info(f"Copying `{source}` to another filesystem.")
+        try:
+            with open(source, "rb") as source_file, open(temp_target, "wb") as target_file:
+                size = os.fstat(source_file.fileno()).st_size
+                copied = kernel_copy(source_file.fileno(), target_file.fileno(), size)
+                if copied != size:
+                    raise OSError(f"Copied {copied} of {size} bytes of `{source}`.")
+
+                if self.fsync != "none":
+                    os.fsync(target_file.fileno())
+
+            shutil.copystat(source, temp_target)
+            os.replace(temp_target, target)
+
+        except BaseException:
+            if os.path.exists(temp_target):
+                os.remove(temp_target)
+
+            raise
+
+        os.remove(source)
@@ -25,129 +25,35 @@ OTHER DEALINGS IN THE SOFTWARE.
 For more information, please refer to <https://unlicense.org>
 """
 
-import os
-from datetime import timedelta
-
-from core import info
-from core.ASCIIGraphs.asciigraphs import ASCIIGraphs
+from core.manifest import postprocessor_files
 
 
 class YTDLHook():
     """
     YouTube-DL Hook.
+
+    The hook does not draw anything; it publishes the progress of its job
+    to the dashboard, which draws the progress of every job at once.
     """
 
-    def __init__(self, logger):
+    def __init__(self, logger, dashboard, run_report, run_metrics, manifests: dict, job_name: str):
         """
         The initialization method of YTDLHook() class.
 
         :param class logger: The logger object.
+        :param class dashboard: The dashboard where the progress is published.
+        :param class run_report: The RunReport() object where finished downloads are counted.
+        :param class run_metrics: The Metrics() object where downloaded bytes are counted.
+        :param dict manifests: The Manifest() object of the URL that each job is downloading, by the job names.
+        :param str job_name: The name of the job that owns this hook.
         """
 
         self.logger = logger
-
-    def size_converter(self, bytes_to_convert: int, divisor: int = 1024):
-        """
-        Automatically convert bytes into kilobytes/megabytes/etc.
-
-        :param int bytes_to_convert: This is the float to be converted.
-        :param int divisor: As far as I know, there are people who use 1000 instead of 1024 so I won't hardcode it.
-
-        :returns tuple: The value and the unit. (B, KB, MB, GB, TB, PB)
-        """
-
-        try:
-            result = bytes_to_convert / divisor
-
-            # Check if need to convert KB to MB.
-            if result > divisor:
-                result = result / divisor
-                # Check if need to convert MB to GB.
-                if result > divisor:
-                    result = result / divisor
-                    # Check if need to convert GB to TB.
-                    if result > divisor:
-                        result = result / divisor
-                        # Check if need to convert TB to PB.
-                        if result > divisor:
-                            # self.logger.info("Returning in `petabytes` form.")
-                            return (round(result / divisor, 2), "PB")  # Let's make PB the largest unit we'll use.
-
-                        else:
-                            # self.logger.info("Returning in `terabytes` form.")
-                            return (round(result, 2), "TB")
-
-                    else:
-                        # self.logger.info("Returning in `gigabytes` form.")
-                        return (round(result, 2), "GB")
-
-                else:
-                    # self.logger.info("Returning in `megabytes` form.")
-                    return (round(result, 2), "MB")
-
-            else:
-                # self.logger.info("Returning in `kilobytes` form.")
-                return (round(result, 2), "KB")
-
-        except ZeroDivisionError:
-            # self.logger.info("Returning in `bytes` form.")
-            return (0, "B")
-
-    def downloading(self, d):
-        """
-        :param str d: The argument youtube_dl sends.
-        """
-
-        # self.logger.info("Hook called.")
-        # self.logger.info("Setting t_size.")
-        if d.get("total_bytes", None) is not None:
-            # self.logger.info("t_size is d[\"total_bytes\"]")
-            t_size = self.size_converter(d.get("total_bytes", None))
-            percent_divisor = d.get("total_bytes", None)
-
-        elif d.get("total_bytes_estimate", None) is not None:
-            # self.logger.info("t_size is d[\"total_bytes_estimate\"]")
-            t_size = self.size_converter(d.get("total_bytes_estimate", None))
-            percent_divisor = d.get("total_bytes_estimate", None)
-
-        else:
-            # self.logger.info("t_size is NULL.")
-            t_size = "---.--"
-            percent_divisor = 0
-
-        # self.logger.info("Setting dl_size.")
-        dl_size = self.size_converter(d.get("downloaded_bytes", 0))
-        percent_dividend = d.get("downloaded_bytes", 0)
-
-        if d.get("eta", None) is not None:
-            # self.logger.info("Setting ETA.")
-            eta = str(timedelta(seconds=d.get("eta", 0)))
-
-        else:
-            # self.logger.info("Setting ETA. (ETA is N/A)")
-            eta = "N/A"
-
-        if d.get("speed", None) is not None:
-            # self.logger.info("Setting speed.")
-            speed_tmp = self.size_converter(d.get("speed", 0), 1000)  # Set it to 1000 because the unit is `bits` not `bytes`.
-            speed = " | {0}{1}".format(speed_tmp[0], (speed_tmp[1].lower() + "ps"))
-
-        else:
-            # self.logger.info("speed is None.")
-            speed = ""
-
-        # self.logger.info("Setting percentage.")
-        percentage = round((percent_dividend / percent_divisor) * 100, 1)
-
-        # self.logger.info("Assembling description.")
-        desc = f"[i] Downloaded: {dl_size[0]}{dl_size[1]}/{t_size[0]}{t_size[1]} ({percentage}%) [ETA: {eta}{speed}]"
-        if len(desc) < info.max_desc_length:
-            desc = desc + (' ' * (info.max_desc_length - len(desc)))
-
-        # self.logger.debug(desc)
-
-        # self.logger.info("Calling ASCIIGraphs.")
-        ASCIIGraphs().progress_bar_manual(desc, percentage, 100)
+        self.dashboard = dashboard
+        self.run_report = run_report
+        self.run_metrics = run_metrics
+        self.manifests = manifests
+        self.job_name = job_name
 
     def main(self, d):
         """
@@ -156,16 +62,35 @@ class YTDLHook():
         :param str d: The argument youtube_dl sends.
         """
 
-        # self.logger.info(f"Status is `{d['status']}`...")
         if d["status"] == "downloading":
-            self.downloading(d)
+            self.dashboard.publish(self.job_name, d)
+            self.run_metrics.progress(self.job_name, d)
+            manifest = self.manifests.get(self.job_name)
+            if manifest is not None and d.get("tmpfilename"):
+                manifest.downloading(d["tmpfilename"])
+
+        elif d["status"] == "finished":
+            self.dashboard.publish(self.job_name, d)
+            self.run_report.file_finished(self.job_name, d)
+            self.run_metrics.progress(self.job_name, d)
+            manifest = self.manifests.get(self.job_name)
+            if manifest is not None:
+                manifest.add(d["filename"])
 
         elif d["status"] == "error":
             pass
 
-        elif d["status"] == "finished":
-            print("[i] Post-processing...")
-
         else:
             # self.logger.error("Unknown status recieved.")
             print("[!] Unkown status recieved: `{0}`".format(d["status"]))
+
+    def postprocessor(self, d):
+        """
+        The postprocessor hook of YTDLHook() class.
+
+        :param dict d: The argument `postprocessors.report_postprocessed()` sends.
+        """
+
+        manifest = self.manifests.get(self.job_name)
+        if manifest is not None:
+            manifest.update(postprocessor_files(d))
@@ -41,4 +41,21 @@ title = f"{name} v{version[str]}"
 logfile = "ytdl.log"
 download_path = "downloads"
 temp_dl_path = ".temp"
-max_desc_length = 65  # `os.get_terminal_size()[1]` is not working.
+archive_file = ".archive"  # The download archive, stored inside `download_path`.
+cache_dir = ".cache"  # The extracted info cache, stored inside `temp_dl_path`.
+info_cache_ttl = 86400  # Cached metadata is valid for a day...
+format_cache_ttl = 18000  # ...but YouTube's signed format URLs expire after about 6 hours.
+progress_refresh_rate = 10  # How many times per second the progress bar is drawn.
+plain_progress_interval = 10  # How often (in seconds) the progress is printed when the output is not a terminal.
+metrics_interval = 15  # How often (in seconds) the metrics textfile is written.
+range_chunk_size = 8388608  # The size of each byte range when downloading with multiple connections. (8 MiB)
+range_block_size = 262144  # How much of a byte range is read at a time. (256 KiB)
+bandwidth_check_interval = 1  # How often (in seconds) the bandwidth control file is checked for changes.
+bandwidth_min_wait = 0.01  # The shortest time (in seconds) a download waits for the bandwidth limit.
+copy_block_size = 67108864  # How much of a file is copied at a time when moving it to another filesystem. (64 MiB)
+journal_sync_interval = 1  # How often (in seconds) the job journal is synced to the disk.
+partial_max_age = 604800  # Partial downloads older than this (in seconds) are removed. (A week)
+daemon_port = 8750  # The local port of the daemon API.
+daemon_token_file = ".ytdler-daemon-{port}.token"  # The token of the daemon API, stored in the home directory.
+daemon_max_wait = 300  # The longest time (in seconds) a daemon client can wait for a job in one request.
+daemon_max_jobs = 1000  # The number of finished jobs the daemon keeps for the clients to check.
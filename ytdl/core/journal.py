@@ -0,0 +1,229 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+import json
+import threading
+
+from core import info
+
+# The states of each URL, in the order they happen.
+states = ("queued", "extracting", "listed", "downloading", "postprocessing", "done", "skipped", "failed")
+
+# The states of the URLs that do not have to be downloaded again when resuming.
+finished_states = ("done", "skipped")
+
+
+class Journal():
+    """
+    A write-ahead log of the state of every URL in a run, so that an
+    interrupted run can be resumed where it stopped.
+
+    Each line is a JSON object. The first line has the sources of the URLs,
+    and the other lines have the media type, URL and new state of a URL.
+    Lines are written before the work they describe starts, and synced to
+    the disk in batches every <sync_interval> seconds instead of one by one.
+    """
+
+    def __init__(self, journal_path: str, logger, sources: list = None, sync_interval: float = info.journal_sync_interval):
+        """
+        The initialization method of Journal() class.
+
+        An existing journal is loaded and appended to.
+
+        :param str journal_path: The filepath of the journal.
+        :param class logger: The logger class.
+        :param list sources: The URLs, filepaths, or `-` that the URLs are read from. (Only used for new journals.)
+        :param float sync_interval: How often (in seconds) the journal is synced to the disk.
+        """
+
+        self.journal_path = journal_path
+        self.logger = logger
+        self.sources = sources
+        self.sync_interval = sync_interval
+        self._states = {}  # The latest state of each URL, by `<media> <url>`.
+        self._entries = {}  # The entries of the listed playlists, by `<media> <url>`.
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._sync_thread = None
+
+        new_journal = not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0
+        if not new_journal:
+            self._load()
+
+        self._file = open(self.journal_path, 'a', encoding="utf-8")
+        if new_journal:
+            self._write({"sources": self.sources})
+            self.sync()
+
+    def _load(self):
+        """
+        Load the states of the URLs from the journal file.
+        """
+
+        with open(self.journal_path, 'rb') as f:
+            data = f.read()
+
+        if not data.endswith(b'\n'):
+            # The last line was cut short because the run was killed while writing it.
+            # Remove it, or the next line would be appended to it and become unreadable too.
+            self.logger.warning("Removing the incomplete last line of the journal.")
+            data = data[:data.rfind(b'\n') + 1]
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(len(data))
+
+        for line_number, line in enumerate(data.decode("utf-8", errors="replace").splitlines(), 1):
+            try:
+                entry = json.loads(line)
+
+            except ValueError:
+                self.logger.warning(f"Ignoring the broken line {line_number} of the journal.")
+                continue
+
+            if "sources" in entry:
+                self.sources = entry["sources"]
+                continue
+
+            key = f"{entry['media']} {entry['url']}"
+            self._states[key] = entry["state"]
+            if "entries" in entry:
+                self._entries[key] = [(entry_url, tuple(entry_info) if entry_info else None) for entry_url, entry_info in entry["entries"]]
+
+        finished = sum(1 for state in self._states.values() if state in finished_states)
+        self.logger.info(f"Loaded {len(self._states)} URLs from the journal, {finished} of them are finished.")
+
+    def _write(self, entry: dict):
+        """
+        Write a line to the journal. (The caller must hold the lock, or be the only thread.)
+
+        :param dict entry: The object to write.
+        """
+
+        self._file.write(json.dumps(entry) + '\n')
+        self._dirty = True
+
+    def record(self, media: str, url: str, state: str, entries: list = None, error: str = None):
+        """
+        Record the new state of a URL.
+
+        :param str media: The type of media that is downloaded. (e.g., `video and audio`)
+        :param str url: The URL.
+        :param str state: The new state of the URL. (See `states`.)
+        :param list entries: The entries of a listed playlist, as returned by `Downloader._playlist_entries()`. (Optional)
+        :param str error: Why the URL failed. (Optional)
+        """
+
+        entry = {"media": media, "url": url, "state": state}
+        if entries is not None:
+            entry["entries"] = entries
+
+        if error is not None:
+            entry["error"] = error
+
+        with self._lock:
+            self._states[f"{media} {url}"] = state
+            if entries is not None:
+                self._entries[f"{media} {url}"] = entries
+
+            self._write(entry)
+
+    def state(self, media: str, url: str):
+        """
+        Get the latest state of a URL.
+
+        :param str media: The type of media that is downloaded.
+        :param str url: The URL.
+
+        :returns str: The state, or None if the URL is not in the journal.
+        """
+
+        return self._states.get(f"{media} {url}")
+
+    def is_finished(self, media: str, url: str):
+        """
+        Check if a URL does not have to be downloaded again.
+
+        :param str media: The type of media that is downloaded.
+        :param str url: The URL.
+
+        :returns bool: True if the URL is done or skipped.
+        """
+
+        return self._states.get(f"{media} {url}") in finished_states
+
+    def entries(self, media: str, url: str):
+        """
+        Get the entries of a playlist that was already listed.
+
+        :param str media: The type of media that is downloaded.
+        :param str url: The URL of the playlist.
+
+        :returns list: The entries, or None if the playlist was not listed yet.
+        """
+
+        return self._entries.get(f"{media} {url}")
+
+    def sync(self):
+        """
+        Write the buffered lines to the disk.
+        """
+
+        with self._lock:
+            if not self._dirty:
+                return
+
+            self._file.flush()
+            self._dirty = False
+
+        os.fsync(self._file.fileno())
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.sync_interval):
+            self.sync()
+
+    def start(self):
+        """
+        Start syncing the journal in the background.
+        """
+
+        self._stop.clear()
+        self._sync_thread = threading.Thread(target=self._sync_loop, name="journal", daemon=True)
+        self._sync_thread.start()
+
+    def close(self):
+        """
+        Sync and close the journal.
+        """
+
+        self._stop.set()
+        if self._sync_thread is not None:
+            self._sync_thread.join()
+            self._sync_thread = None
+
+        self.sync()
+        self._file.close()
@@ -0,0 +1,125 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+
+
+def postprocessor_files(d: dict):
+    """
+    Get the files that a postprocessor left behind, from the argument of a postprocessor hook.
+
+    The file of the info dict and its subtitles are produced, and the files
+    that YouTube-DL deleted after the postprocessor are removed.
+
+    :param dict d: The argument of the postprocessor hook. (See `postprocessors.report_postprocessed()`)
+
+    :returns dict: The lists of the `produced` and `deleted` files.
+    """
+
+    from youtube_dl.utils import subtitles_filename  # Already imported by the postprocessor that called the hook.
+
+    info = d["info_dict"]
+    produced = [info["filepath"]]
+    for lang, sub_info in (info.get("requested_subtitles") or {}).items():
+        produced.append(subtitles_filename(info["filepath"], lang, sub_info["ext"], info.get("ext")))
+
+    return {"produced": produced, "deleted": list(d.get("files_to_delete") or [])}
+
+
+class Manifest():
+    """
+    The files that the download of one URL produced in the temporary folder.
+
+    YTDLHook() adds the files that youtube_dl downloads and the files that the
+    postprocessors produce and delete, so that the files of a URL are known
+    without listing the temporary folder, even when other jobs are writing
+    files with similar names into it.
+    """
+
+    def __init__(self):
+        """
+        The initialization method of Manifest() class.
+        """
+
+        self._files = {}  # The produced files, in order. (The values are not used.)
+        self._partial_files = set()  # The temporary files of the downloads. (e.g., `<filename>.part`)
+
+    def downloading(self, tmpfilename: str):
+        """
+        Add the temporary file of a download in progress.
+
+        :param str tmpfilename: The path of the temporary file.
+        """
+
+        self._partial_files.add(tmpfilename)
+
+    def add(self, filename: str):
+        """
+        Add a produced file.
+
+        :param str filename: The path of the file.
+        """
+
+        self._files[filename] = None
+
+    def remove(self, filename: str):
+        """
+        Remove a file that was deleted.
+
+        :param str filename: The path of the file.
+        """
+
+        self._files.pop(filename, None)
+
+    def update(self, files: dict):
+        """
+        Add and remove the files returned by `postprocessor_files()`.
+
+        :param dict files: The lists of the `produced` and `deleted` files.
+        """
+
+        for filename in files["produced"]:
+            self.add(filename)
+
+        for filename in files["deleted"]:
+            self.remove(filename)
+
+    @property
+    def files(self):
+        """
+        The produced files that still exist.
+        """
+
+        return [filename for filename in self._files if os.path.exists(filename)]
+
+    @property
+    def partial_files(self):
+        """
+        The temporary files of the downloads that were left behind.
+        """
+
+        return [filename for filename in self._partial_files if filename not in self._files and os.path.exists(filename)]
@@ -0,0 +1,266 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+
+import os
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core import info
+
+# The upper bounds (in seconds) of the latency histogram buckets.
+latency_buckets = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class Histogram():
+    """
+    A Prometheus histogram.
+    """
+
+    def __init__(self, buckets: tuple = latency_buckets):
+        """
+        The initialization method of Histogram() class.
+
+        :param tuple buckets: The upper bounds of the buckets, from smallest to largest.
+        """
+
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one is the `+Inf` bucket.
+        self.sum = 0
+
+    def observe(self, value: float):
+        """
+        Add a value to the histogram.
+
+        :param float value: The value to add.
+        """
+
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name: str):
+        """
+        Make the lines of the histogram.
+
+        :param str name: The name of the metric.
+
+        :returns list: The lines in Prometheus' text format.
+        """
+
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {total}')
+
+        lines.append(f"{name}_sum {self.sum}")
+        lines.append(f"{name}_count {total}")
+        return lines
+
+
+class Metrics():
+    """
+    Counts finished URLs, downloaded bytes, and the latency of each
+    extraction and download, and exposes them in Prometheus' text format.
+
+    The metrics can be written to a file for node_exporter's textfile
+    collector, or served by a small HTTP server at `/metrics`.
+    """
+
+    def __init__(self, logger):
+        """
+        The initialization method of Metrics() class.
+
+        :param class logger: The logger class.
+        """
+
+        self.logger = logger
+        self.items = {}  # The number of URLs finished with each status.
+        self.downloaded_bytes = {}  # The number of bytes downloaded by each job.
+        self.histograms = {"extract": Histogram(), "download": Histogram()}
+        self.gauges = {}  # Functions that return the current value of each gauge.
+        self._progress = {}  # The file and downloaded bytes each job has last reported.
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._writer = None
+        self._server = None
+
+    def set_gauge(self, name: str, function):
+        """
+        Set the function that returns the current value of a gauge.
+
+        :param str name: The name of the gauge, without the `ytdler_` prefix.
+        :param function function: The function that returns the value.
+        """
+
+        self.gauges[name] = function
+
+    def report_event(self, event: str, fields: dict):
+        """
+        Count a run report event. This is added as a RunReport() listener.
+
+        :param str event: The name of the event.
+        :param dict fields: The fields of the event.
+        """
+
+        with self._lock:
+            if event == "phase" and fields["phase"] in self.histograms:
+                self.histograms[fields["phase"]].observe(fields["seconds"])
+
+            elif event == "item":
+                self.items[fields["status"]] = self.items.get(fields["status"], 0) + 1
+
+    def progress(self, job_name: str, d: dict):
+        """
+        Count the newly downloaded bytes. This is called by the progress hooks.
+
+        :param str job_name: The name of the job.
+        :param dict d: The argument youtube_dl sends to the progress hooks.
+        """
+
+        # Only the job's own thread changes its counters, so no lock is needed.
+        filename, last_bytes = self._progress.get(job_name, (None, 0))
+        if d["status"] == "finished":
+            self._progress.pop(job_name, None)
+            if filename != d.get("filename"):
+                return  # The file was already downloaded before.
+
+            downloaded_bytes = d.get("total_bytes") or d.get("downloaded_bytes") or last_bytes
+
+        else:
+            downloaded_bytes = d.get("downloaded_bytes") or 0
+            if filename != d.get("filename"):
+                last_bytes = 0
+
+            self._progress[job_name] = (d.get("filename"), downloaded_bytes)
+
+        if downloaded_bytes > last_bytes:
+            self.downloaded_bytes[job_name] = self.downloaded_bytes.get(job_name, 0) + downloaded_bytes - last_bytes
+
+    def render(self):
+        """
+        Make the metrics.
+
+        :returns str: The metrics in Prometheus' text format.
+        """
+
+        lines = [
+            "# HELP ytdler_items_total The number of finished URLs by status.",
+            "# TYPE ytdler_items_total counter"
+        ]
+        with self._lock:
+            for status in ("success", "failed", "skipped"):
+                lines.append(f'ytdler_items_total{{status="{status}"}} {self.items.get(status, 0)}')
+
+            lines.append("# HELP ytdler_downloaded_bytes_total The number of downloaded bytes.")
+            lines.append("# TYPE ytdler_downloaded_bytes_total counter")
+            lines.append(f"ytdler_downloaded_bytes_total {sum(list(self.downloaded_bytes.values()))}")
+            for phase, histogram in self.histograms.items():
+                lines.append(f"# HELP ytdler_{phase}_seconds How long each {phase} took.")
+                lines.append(f"# TYPE ytdler_{phase}_seconds histogram")
+                lines += histogram.render(f"ytdler_{phase}_seconds")
+
+        for name, function in self.gauges.items():
+            lines.append(f"# TYPE ytdler_{name} gauge")
+            lines.append(f"ytdler_{name} {function()}")
+
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, textfile_path: str):
+        """
+        Write the metrics to <textfile_path>.
+
+        The file is replaced atomically so node_exporter never reads half of it.
+
+        :param str textfile_path: Where to write the metrics.
+        """
+
+        temp_path = f"{textfile_path}.tmp"
+        with open(temp_path, 'w', encoding="utf-8") as f:
+            f.write(self.render())
+
+        os.replace(temp_path, textfile_path)
+
+    def start(self, textfile_path: str = None, port: int = None):
+        """
+        Start writing the metrics to <textfile_path> and/or serving them on <port>.
+
+        :param str textfile_path: Where to write the metrics every `info.metrics_interval` seconds. (Optional)
+        :param int port: The local port where `/metrics` is served. (Optional)
+        """
+
+        if textfile_path is not None:
+            self.logger.info(f"Writing metrics to `{textfile_path}`.")
+
+            def write_loop():
+                while not self._stop.wait(info.metrics_interval):
+                    self.write_textfile(textfile_path)
+
+                self.write_textfile(textfile_path)  # Write the final values.
+
+            self._stop.clear()
+            self._writer = threading.Thread(target=write_loop, name="metrics_writer", daemon=True)
+            self._writer.start()
+
+        if port is not None:
+            self.logger.info(f"Serving metrics on port {port}.")
+            metrics = self
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path != "/metrics":
+                        self.send_error(404)
+                        return
+
+                    body = metrics.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+            threading.Thread(target=self._server.serve_forever, name="metrics_server", daemon=True).start()
+
+    def stop(self):
+        """
+        Stop writing and serving the metrics.
+        """
+
+        if self._writer is not None:
+            self._stop.set()
+            self._writer.join()
+            self._writer = None
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
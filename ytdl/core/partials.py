@@ -0,0 +1,188 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+import json
+import time
+
+# The extension of the temporary files of unfinished downloads. (HttpFD's `.part` and RangeFD's `.ranges.part`)
+partial_extension = ".part"
+
+# The extension of the state file that is kept next to each partial file.
+state_extension = ".json"
+
+
+def read_state(tmpfilename: str):
+    """
+    Read the state of the partial download <tmpfilename>.
+
+    :param str tmpfilename: The path of the partial file.
+
+    :returns dict: The state, or None if it does not exist or cannot be read.
+    """
+
+    try:
+        with open(tmpfilename + state_extension, 'r', encoding="utf-8") as f:
+            return json.load(f)
+
+    except (OSError, ValueError):
+        return None
+
+
+def write_state(tmpfilename: str, state: dict):
+    """
+    Write the state of the partial download <tmpfilename>, replacing the old one atomically.
+
+    :param str tmpfilename: The path of the partial file.
+    :param dict state: The state. (e.g., `{"id": ..., "format_id": ..., "total_bytes": ...}`)
+    """
+
+    state_path = tmpfilename + state_extension
+    with open(state_path + ".tmp", 'w', encoding="utf-8") as f:
+        json.dump(state, f)
+
+    os.replace(state_path + ".tmp", state_path)
+
+
+def new_state(info_dict: dict, total_bytes: int = None):
+    """
+    Make the state of a new partial download.
+
+    :param dict info_dict: The info dict of the format that is downloaded.
+    :param int total_bytes: The size of the format, if it is known.
+
+    :returns dict: The state.
+    """
+
+    return {
+        "id": info_dict.get("id"),
+        "format_id": info_dict.get("format_id"),
+        "total_bytes": total_bytes or info_dict.get("filesize")
+    }
+
+
+def can_resume(tmpfilename: str, info_dict: dict, total_bytes: int = None):
+    """
+    Check if the partial download <tmpfilename> belongs to the format in <info_dict>.
+
+    A partial file without a state was not written by this program (or its
+    state was lost), so it cannot be trusted.
+
+    :param str tmpfilename: The path of the partial file.
+    :param dict info_dict: The info dict of the format that is downloaded.
+    :param int total_bytes: The size of the format, if it is known.
+
+    :returns dict: The state of the partial download, or None if it cannot be resumed.
+    """
+
+    state = read_state(tmpfilename)
+    if state is None or not os.path.exists(tmpfilename):
+        return None
+
+    expected = new_state(info_dict, total_bytes)
+    if state.get("id") != expected["id"] or state.get("format_id") != expected["format_id"]:
+        return None
+
+    if None not in (state.get("total_bytes"), expected["total_bytes"]) and state["total_bytes"] != expected["total_bytes"]:
+        return None
+
+    if state.get("total_bytes") is not None and os.path.getsize(tmpfilename) > state["total_bytes"]:
+        return None
+
+    return state
+
+
+def remove(tmpfilename: str):
+    """
+    Remove a partial file and its state.
+
+    :param str tmpfilename: The path of the partial file.
+    """
+
+    for path in (tmpfilename, tmpfilename + state_extension):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def disk_usage(stat):
+    """
+    Get the disk space a file uses.
+
+    Partial files can be sparse (RangeFD writes the ranges at their offsets),
+    so their size can be much larger than the space they use.
+
+    :param os.stat_result stat: The stat of the file.
+
+    :returns int: The size in bytes. (The apparent size where the blocks are not known, e.g., on Windows.)
+    """
+
+    blocks = getattr(stat, "st_blocks", None)
+    return blocks * 512 if blocks is not None else stat.st_size
+
+
+def collect_garbage(temp_dl_path: str, max_age: int = 0, budget: int = 0, logger = None):
+    """
+    Remove the partial downloads in <temp_dl_path> that are too old or do not fit in the disk budget.
+
+    The newest partial files are kept first, since they are the most likely to be resumed.
+
+    :param str temp_dl_path: The path of the temporary folder.
+    :param int max_age: Remove the partial files older than this. (In seconds, 0 keeps them regardless of age.)
+    :param int budget: The total disk space (in bytes) the partial files can use. (0 means no limit.)
+    :param class logger: The logger class. (Optional)
+
+    :returns tuple: The number of partial files removed, and the disk space they used in bytes.
+    """
+
+    if not os.path.isdir(temp_dl_path):
+        return 0, 0
+
+    partial_files = []  # Tuples of the modification time, disk usage, and path of each partial file.
+    with os.scandir(temp_dl_path) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(partial_extension):
+                stat = entry.stat()
+                partial_files.append((stat.st_mtime, disk_usage(stat), entry.path))
+
+            elif entry.name.endswith(partial_extension + state_extension) and not os.path.exists(entry.path[:-len(state_extension)]):
+                os.remove(entry.path)  # The partial file of this state is gone.
+
+    now = time.time()
+    kept_size = 0
+    removed = []
+    for mtime, size, path in sorted(partial_files, reverse=True):
+        if (max_age > 0 and now - mtime > max_age) or (budget > 0 and kept_size + size > budget):
+            remove(path)
+            removed.append(size)
+
+        else:
+            kept_size += size
+
+    if logger is not None and len(removed) > 0:
+        logger.info(f"Removed {len(removed)} stale partial downloads. ({sum(removed)} bytes)")
+
+    return len(removed), sum(removed)
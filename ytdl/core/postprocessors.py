@@ -0,0 +1,324 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+import re
+
+from youtube_dl import postprocessor
+from youtube_dl.utils import ISO639Utils, prepend_extension, replace_extension, subtitles_filename
+from youtube_dl.postprocessor.common import AudioConversionError
+from youtube_dl.postprocessor.ffmpeg import FFmpegPostProcessor, FFmpegPostProcessorError
+
+
+def get_postprocessor(key: str):
+    """
+    Get a postprocessor class using its key, like `youtube_dl.postprocessor.get_postprocessor()`.
+
+    The postprocessors in this module are searched first.
+
+    :param str key: The key of the postprocessor. (e.g., `FFmpegMetadata`)
+
+    :returns class: The postprocessor class.
+    """
+
+    return globals().get(key + "PP") or postprocessor.get_postprocessor(key)
+
+
+def report_postprocessed(downloader, info: dict, files_to_delete: list = (), status: str = "finished"):
+    """
+    Call the `postprocessor_hooks` of <downloader>, which YouTube-DL does not have by itself.
+
+    :param class downloader: The YoutubeDL object.
+    :param dict info: The info dict after the postprocessor.
+    :param list files_to_delete: The files that were deleted after the postprocessor.
+    :param str status: `started` before the first postprocessor, `finished` after each postprocessor.
+    """
+
+    for hook in downloader.params.get("postprocessor_hooks") or []:
+        hook({"status": status, "info_dict": info, "files_to_delete": list(files_to_delete)})
+
+
+def metadata_options(info: dict) -> list:
+    """
+    Get the ffmpeg options that add the metadata of <info>, like `FFmpegMetadataPP()`.
+
+    :param dict info: The info dict of the download.
+
+    :returns list: The ffmpeg options. (e.g., `["-metadata", "title=..."]`)
+    """
+
+    metadata = {}
+    for meta_fields, info_fields in (
+            ("title", ("track", "title")),
+            ("date", "upload_date"),
+            (("description", "comment"), "description"),
+            ("purl", "webpage_url"),
+            ("track", "track_number"),
+            ("artist", ("artist", "creator", "uploader", "uploader_id")),
+            ("genre", "genre"),
+            ("album", "album"),
+            ("album_artist", "album_artist"),
+            ("disc", "disc_number"),
+            ("show", "series"),
+            ("season_number", "season_number"),
+            ("episode_id", ("episode", "episode_id")),
+            ("episode_sort", "episode_number")):
+        meta_fields = meta_fields if isinstance(meta_fields, tuple) else (meta_fields,)
+        info_fields = info_fields if isinstance(info_fields, tuple) else (info_fields,)
+        value = next((info[info_field] for info_field in info_fields if info.get(info_field) is not None), None)
+        if value is not None:
+            for meta_field in meta_fields:
+                metadata[meta_field] = value
+
+    options = []
+    for name, value in metadata.items():
+        options += ["-metadata", f"{name}={value}"]
+
+    return options
+
+
+def write_chapters(info: dict, filename: str):
+    """
+    Write the chapters of <info> to an ffmpeg metadata file next to <filename>.
+
+    :param dict info: The info dict of the download.
+    :param str filename: The path of the media file.
+
+    :returns str | None: The path of the metadata file, or None if there are no chapters.
+    """
+
+    chapters = info.get("chapters")
+    if not chapters:
+        return None
+
+    def ffmpeg_escape(text):
+        return re.sub(r"(=|;|#|\\|\n)", r"\\\1", text)
+
+    content = ";FFMETADATA1\n"
+    for chapter in chapters:
+        content += f"[CHAPTER]\nTIMEBASE=1/1000\nSTART={int(chapter['start_time'] * 1000)}\nEND={int(chapter['end_time'] * 1000)}\n"
+        if chapter.get("title"):
+            content += f"title={ffmpeg_escape(chapter['title'])}\n"
+
+    metadata_filename = replace_extension(filename, "meta")
+    with open(metadata_filename, "w", encoding="utf-8") as metadata_file:
+        metadata_file.write(content)
+
+    return metadata_filename
+
+
+class FFmpegFusedVideoPP(FFmpegPostProcessor):
+    """
+    Merge the formats, embed the subtitles, add the metadata and apply the
+    fixups of a downloaded video in a single ffmpeg pass.
+
+    `FFmpegMergerPP`, `FFmpegEmbedSubtitlePP`, `FFmpegMetadataPP` and the
+    fixup postprocessors each copy the whole video to a new file. Since all
+    of them only copy streams, they are combined into one command instead.
+    `youtubedl.run_postprocessing()` passes the names of the merger and fixup
+    postprocessors that YouTube-DL scheduled in `__fused_postprocessors`.
+    """
+
+    # The YouTube-DL postprocessors that this postprocessor does the work of.
+    fuses = ("FFmpegMergerPP", "FFmpegFixupStretchedPP", "FFmpegFixupM4aPP", "FFmpegFixupM3u8PP")
+
+    def __init__(self, downloader=None, embed_subs: bool = True):
+        """
+        The initialization method of FFmpegFusedVideoPP() class.
+
+        :param class downloader: The YoutubeDL object.
+        :param bool embed_subs: Embed the downloaded subtitles?
+        """
+
+        FFmpegPostProcessor.__init__(self, downloader)
+        self._embed_subs = embed_subs
+
+    def _subtitles(self, information):
+        """
+        Get the subtitle files to embed, like `FFmpegEmbedSubtitlePP()`.
+
+        :returns list: A list of tuples of the language and the path of the subtitle file.
+        """
+
+        ext = information["ext"]
+        subtitles = information.get("requested_subtitles")
+        if not self._embed_subs or not subtitles:
+            return []
+
+        if ext not in ("mp4", "webm", "mkv"):
+            self._downloader.to_screen("[ffmpeg] Subtitles can only be embedded in mp4, webm or mkv files")
+            return []
+
+        subtitle_files = []
+        for lang, sub_info in subtitles.items():
+            sub_filename = subtitles_filename(information["filepath"], lang, sub_info["ext"], ext)
+            if ext == "webm" and sub_info["ext"] != "vtt":
+                self._downloader.to_screen("[ffmpeg] Only WebVTT subtitles can be embedded in webm files")
+            elif os.path.exists(sub_filename):
+                subtitle_files.append((lang, sub_filename))
+
+        return subtitle_files
+
+    def run(self, information):
+        filename = information["filepath"]
+        fused = information.get("__fused_postprocessors") or []
+        merging = "FFmpegMergerPP" in fused
+        input_files = list(information["__files_to_merge"]) if merging else [filename]
+
+        options = ["-c", "copy"]
+        if merging:
+            options += ["-map", "0:v:0", "-map", "1:a:0"]
+        else:
+            # Don't copy Apple TV chapters track, bin_data (see `FFmpegEmbedSubtitlePP()`).
+            options += ["-map", "0", "-map", "-0:d"]
+
+        subtitle_files = self._subtitles(information)
+        if subtitle_files:
+            if not merging:
+                options += ["-map", "-0:s"]  # The existing subtitles are replaced.
+            if information["ext"] == "mp4":
+                options += ["-c:s", "mov_text"]
+            for index, (lang, sub_filename) in enumerate(subtitle_files):
+                options += ["-map", f"{len(input_files)}:0"]
+                options += [f"-metadata:s:s:{index}", f"language={ISO639Utils.short2long(lang) or lang}"]
+                input_files.append(sub_filename)
+
+        options += metadata_options(information)
+        stretched_ratio = information.get("stretched_ratio")
+        if "FFmpegFixupStretchedPP" in fused and stretched_ratio not in (None, 1):
+            options += ["-aspect", f"{stretched_ratio:f}"]
+        if "FFmpegFixupM4aPP" in fused and information.get("container") == "m4a_dash":
+            options += ["-f", "mp4"]
+        if "FFmpegFixupM3u8PP" in fused and self.get_audio_codec(input_files[0]) == "aac":
+            options += ["-f", "mp4", "-bsf:a", "aac_adtstoasc"]
+
+        metadata_filename = write_chapters(information, filename)
+        if metadata_filename:
+            options += ["-map_metadata", str(len(input_files))]
+            input_files.append(metadata_filename)
+
+        temp_filename = prepend_extension(filename, "temp")
+        self._downloader.to_screen(f"[ffmpeg] Processing '{filename}' in a single pass")
+        try:
+            self.run_ffmpeg_multiple_files(input_files, temp_filename, options)
+        finally:
+            if metadata_filename:
+                os.remove(metadata_filename)
+        os.replace(temp_filename, filename)
+
+        files_to_delete = [sub_filename for _, sub_filename in subtitle_files]
+        if merging:
+            files_to_delete += information["__files_to_merge"]
+
+        return files_to_delete, information
+
+
+class FFmpegFusedAudioPP(postprocessor.FFmpegExtractAudioPP):
+    """
+    Extract the audio of a download and add its metadata in a single ffmpeg pass,
+    instead of `FFmpegExtractAudioPP` followed by `FFmpegMetadataPP`.
+    """
+
+    def run(self, information):
+        self._information = information  # The metadata of the file that `run_ffmpeg()` writes.
+        files_to_delete, information = super().run(information)
+        if not files_to_delete:
+            # The audio was not converted (e.g., it was downloaded as mp3), so add the metadata separately.
+            return postprocessor.FFmpegMetadataPP(self._downloader).run(information)
+
+        return files_to_delete, information
+
+    def run_ffmpeg(self, path, out_path, codec, more_opts):
+        options = ["-vn"] + (["-acodec", codec] if codec else []) + more_opts + metadata_options(self._information)
+        input_files = [path]
+        metadata_filename = write_chapters(self._information, out_path)
+        if metadata_filename:
+            options += ["-map_metadata", "1"]
+            input_files.append(metadata_filename)
+
+        try:
+            self.run_ffmpeg_multiple_files(input_files, out_path, options)
+        except FFmpegPostProcessorError as err:
+            raise AudioConversionError(err.msg)
+        finally:
+            if metadata_filename:
+                os.remove(metadata_filename)
+
+
+class FFmpegAudioFromVideoPP(FFmpegPostProcessor):
+    """
+    Derive the audio file (and lyrics) of a downloaded video locally.
+
+    This postprocessor must run after the formats are merged and requires the
+    `keepvideo` option, so that the downloaded audio stream is still available.
+    It deletes the original format and subtitle files by itself.
+    """
+
+    def __init__(self, downloader=None, preferredcodec: str = "mp3", lyrics: bool = True):
+        """
+        The initialization method of FFmpegAudioFromVideoPP() class.
+
+        :param class downloader: The YoutubeDL object.
+        :param str preferredcodec: The codec of the audio file.
+        :param bool lyrics: Convert the subtitles to lyrics (lrc) files?
+        """
+
+        FFmpegPostProcessor.__init__(self, downloader)
+        self._preferredcodec = preferredcodec
+        self._lyrics = lyrics
+
+    def run(self, information):
+        video_path = information["filepath"]
+        downloaded_files = information.get("__files_to_merge") or []
+        audio_path = video_path  # A single format contains both video and audio.
+        for downloaded_file, requested_format in zip(downloaded_files, information.get("requested_formats") or []):
+            if requested_format.get("vcodec") == "none":
+                audio_path = downloaded_file
+
+        audio_info = dict(information)
+        audio_info["filepath"] = audio_path
+        _, audio_info = FFmpegFusedAudioPP(self._downloader, preferredcodec=self._preferredcodec).run(audio_info)
+
+        # Name the audio file after the video instead of the audio format. (e.g., `<title> - <id>.f140.mp3`)
+        new_audio_path = os.path.splitext(video_path)[0] + '.' + audio_info["ext"]
+        if audio_info["filepath"] != new_audio_path:
+            os.replace(audio_info["filepath"], new_audio_path)
+            audio_info["filepath"] = new_audio_path
+
+        files_to_delete = list(downloaded_files)
+        if self._lyrics:
+            old_subtitle_files, _ = postprocessor.FFmpegSubtitlesConvertorPP(self._downloader, format="lrc").run(audio_info)
+            files_to_delete += old_subtitle_files
+
+        # youtube_dl does not delete anything when `keepvideo` is enabled.
+        for old_file in files_to_delete:
+            if os.path.exists(old_file):
+                self._downloader.to_screen(f"Deleting original file {old_file}")
+                os.remove(old_file)
+
+        report_postprocessed(self._downloader, audio_info, files_to_delete)
+        return [], information
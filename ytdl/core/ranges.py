@@ -0,0 +1,292 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+
+import os
+import time
+import queue
+import threading
+
+from youtube_dl.utils import sanitized_Request
+from youtube_dl.downloader import PROTOCOL_MAP
+from youtube_dl.downloader.http import HttpFD
+
+from core import info
+from core import partials
+from core import bandwidth
+
+
+class RangeError(Exception):
+    """
+    Raised when a byte range cannot be downloaded.
+    """
+
+
+class RangeFD(HttpFD):
+    """
+    Downloads a single HTTP(S) format over several connections.
+
+    The file is split into byte ranges of `info.range_chunk_size` bytes,
+    and `range_connections` workers download them at the same time.
+    Each worker writes its range directly at its offset in the temporary
+    file, so the memory used does not depend on the size of the file.
+    A failed range is retried from where it stopped, without touching
+    the other ranges.
+
+    Formats that are too small, or servers that do not support ranges,
+    are downloaded by youtube_dl's HttpFD as usual.
+
+    Either way, a state file is kept next to the partial file (see
+    `partials`), so that an interrupted download is resumed on the next
+    attempt only if it belongs to the same video and format. RangeFD
+    records the finished ranges and downloads only the missing ones.
+
+    Both ways draw from the shared `bandwidth.scheduler`.
+    """
+
+    def __init__(self, ydl, params):
+        super().__init__(ydl, params)
+        # youtube_dl creates the downloader in the thread of the job.
+        self.job_name = threading.current_thread().name
+        self._scheduled = 0  # The bytes of the current connection already given to the scheduler.
+
+    def slow_down(self, start_time, now, byte_counter):
+        # HttpFD passes the bytes downloaded since the connection was opened.
+        if byte_counter < self._scheduled:
+            self._scheduled = 0
+
+        bandwidth.scheduler.consume(self.job_name, byte_counter - self._scheduled)
+        self._scheduled = byte_counter
+        super().slow_down(start_time, now, byte_counter)
+
+    def real_download(self, filename, info_dict):
+        connections = self.params.get("range_connections", 1)
+        headers = {"Youtubedl-no-compression": "True"}
+        headers.update(info_dict.get("http_headers") or {})
+        total_bytes = None
+        if connections > 1 and not self.params.get("test", False):
+            total_bytes = self._probe(info_dict["url"], headers)
+
+        if total_bytes is None or total_bytes < info.range_chunk_size * 2:
+            return self._download_single(filename, info_dict)
+
+        return self._download_ranges(filename, info_dict, headers, total_bytes, connections)
+
+    def _download_single(self, filename: str, info_dict: dict):
+        """
+        Download <filename> using HttpFD, which resumes its `.part` file if there is one.
+
+        :returns bool: True if the download is successful.
+        """
+
+        tmpfilename = self.temp_name(filename)
+        if tmpfilename == filename:
+            return super().real_download(filename, info_dict)  # Not using a temporary file. (e.g., `nopart`)
+
+        if os.path.exists(tmpfilename) and partials.can_resume(tmpfilename, info_dict) is None:
+            self.to_screen(f"[download] Discarding {tmpfilename}, since it is not a partial download of this format")
+            partials.remove(tmpfilename)
+
+        partials.write_state(tmpfilename, partials.new_state(info_dict))
+        success = super().real_download(filename, info_dict)
+        if success:
+            partials.remove(tmpfilename)  # Only the state is left, since HttpFD renamed the file.
+
+        return success
+
+    def _probe(self, url: str, headers: dict):
+        """
+        Check if the server supports byte ranges.
+
+        :param str url: The URL of the format.
+        :param dict headers: The HTTP headers to send.
+
+        :returns int: The size of the file, or None if ranges are not supported.
+        """
+
+        try:
+            response = self.ydl.urlopen(sanitized_Request(url, None, dict(headers, Range="bytes=0-0")))
+            response.close()
+
+        except Exception as e:
+            self.report_warning(f"Unable to check if byte ranges are supported, using one connection: {e}")
+            return None
+
+        content_range = response.headers.get("Content-Range", "")
+        if response.getcode() != 206 or '/' not in content_range:
+            return None
+
+        total = content_range.rsplit('/', 1)[1]
+        return int(total) if total.isdigit() else None
+
+    def _download_ranges(self, filename: str, info_dict: dict, headers: dict, total_bytes: int, connections: int):
+        """
+        Download the format in <info_dict> to <filename> using <connections> connections.
+
+        :returns bool: True if the download is successful.
+        """
+
+        # A different name from HttpFD's `.part` file, since HttpFD would resume
+        # a sparse file from its end and skip the ranges that are still missing.
+        url = info_dict["url"]
+        tmpfilename = f"{filename}.ranges.part"
+        part_state = partials.can_resume(tmpfilename, info_dict, total_bytes)
+        if part_state is not None and part_state.get("chunk_size") == info.range_chunk_size and os.path.getsize(tmpfilename) == total_bytes:
+            finished_ranges = set(part_state.get("done") or [])
+
+        else:
+            if os.path.exists(tmpfilename):
+                self.to_screen(f"[download] Discarding {tmpfilename}, since it is not a partial download of this format")
+
+            finished_ranges = set()
+            with open(tmpfilename, "wb") as f:
+                f.truncate(total_bytes)
+
+        part_state = dict(partials.new_state(info_dict, total_bytes), chunk_size=info.range_chunk_size, done=sorted(finished_ranges))
+        partials.write_state(tmpfilename, part_state)
+
+        ranges = queue.Queue()
+        resumed_bytes = 0
+        for start in range(0, total_bytes, info.range_chunk_size):
+            end = min(start + info.range_chunk_size, total_bytes) - 1
+            if start in finished_ranges:
+                resumed_bytes += end - start + 1
+
+            else:
+                ranges.put((start, end))
+
+        if resumed_bytes > 0:
+            self.to_screen(f"[download] Resuming download at byte {resumed_bytes} of {total_bytes} ({len(finished_ranges)} ranges are done)")
+
+        state = {"downloaded": 0, "error": None}
+        lock = threading.Lock()
+        start_time = time.time()
+        retries = self.params.get("fragment_retries", 10)
+
+        def report(byte_count: int):
+            with lock:
+                state["downloaded"] += byte_count
+                downloaded = state["downloaded"]
+                now = time.time()
+                self._hook_progress({
+                    "status": "downloading",
+                    "filename": filename,
+                    "tmpfilename": tmpfilename,
+                    "downloaded_bytes": resumed_bytes + downloaded,
+                    "total_bytes": total_bytes,
+                    "elapsed": now - start_time,
+                    "speed": self.calc_speed(start_time, now, downloaded),
+                    "eta": self.calc_eta(start_time, now, total_bytes - resumed_bytes, downloaded)
+                })
+
+            bandwidth.scheduler.consume(self.job_name, byte_count)
+            HttpFD.slow_down(self, start_time, None, downloaded)
+
+        def download_range(f, start: int, end: int):
+            """
+            Download bytes <start> to <end>, retrying from where it stopped if it fails.
+            """
+
+            count = 0
+            while start <= end:
+                try:
+                    response = self.ydl.urlopen(sanitized_Request(url, None, dict(headers, Range=f"bytes={start}-{end}")))
+                    if response.getcode() != 206:
+                        raise RangeError(f"The server ignored the byte range {start}-{end}.")
+
+                    f.seek(start)
+                    while start <= end:
+                        block = response.read(min(info.range_block_size, end - start + 1))
+                        if not block:
+                            raise IOError(f"The server closed the connection at byte {start}.")
+
+                        f.write(block)
+                        start += len(block)
+                        report(len(block))
+
+                except RangeError:
+                    raise
+
+                except Exception as e:
+                    count += 1
+                    if count > retries:
+                        raise RangeError(f"Giving up on byte range {start}-{end} after {retries} retries: {e}")
+
+                    self.report_retry(e, count, retries)
+
+        def worker():
+            with open(tmpfilename, "r+b") as f:
+                while state["error"] is None:
+                    try:
+                        start, end = ranges.get_nowait()
+
+                    except queue.Empty:
+                        return
+
+                    try:
+                        download_range(f, start, end)
+                        # Make sure the range is on the disk before it is recorded as done.
+                        f.flush()
+                        os.fsync(f.fileno())
+                        with lock:
+                            finished_ranges.add(start)
+                            part_state["done"] = sorted(finished_ranges)
+                            partials.write_state(tmpfilename, part_state)
+
+                    except Exception as e:
+                        state["error"] = e
+
+        self.report_destination(filename)
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(min(connections, ranges.qsize()))]
+        for thread in workers:
+            thread.start()
+
+        for thread in workers:
+            thread.join()
+
+        if state["error"] is not None:
+            self.report_error(str(state["error"]))
+            return False
+
+        self.try_rename(tmpfilename, filename)
+        partials.remove(tmpfilename)  # Only the state is left.
+        self._hook_progress({
+            "status": "finished",
+            "filename": filename,
+            "downloaded_bytes": total_bytes,
+            "total_bytes": total_bytes,
+            "elapsed": time.time() - start_time
+        })
+        return True
+
+
+# youtube_dl picks the downloader of a format from this map, and uses
+# HttpFD for the protocols that are not in it. RangeFD only splits the
+# download when `range_connections` is more than 1, but always draws
+# from the bandwidth scheduler.
+for protocol in ("http", "https"):
+    PROTOCOL_MAP.setdefault(protocol, RangeFD)
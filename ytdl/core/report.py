@@ -0,0 +1,246 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+
+import json
+import time
+import threading
+import contextlib
+
+# The phases of each item, in the order they happen.
+phases = ("cache", "extract", "skip-check", "download", "postprocess", "move")
+
+
+class RunReport():
+    """
+    Collects how long each URL spent in each phase and how many bytes it
+    downloaded, so that slow batches can be looked into afterwards.
+    """
+
+    def __init__(self, logger, events_path: str = None):
+        """
+        The initialization method of RunReport() class.
+
+        :param class logger: The logger class.
+        :param str events_path: Where to write each event as a JSON line while running. (Optional)
+        """
+
+        self.logger = logger
+        self.started = time.time()
+        self.items = []
+        self._jobs = {}  # The item that each job is downloading.
+        self.listeners = []  # Functions that are called with every event.
+        self._lock = threading.Lock()
+        self._events = None
+        if events_path is not None:
+            self.logger.info(f"Writing events to `{events_path}`.")
+            self._events = open(events_path, 'a', encoding="utf-8")
+
+    def add_listener(self, listener):
+        """
+        Call <listener> with the name and the fields of every event.
+
+        :param function listener: The function to call.
+        """
+
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def _event(self, event: str, **fields):
+        """
+        Send an event to the listeners and write it to the event stream, if there is one.
+
+        :param str event: The name of the event.
+        :param **fields: The fields of the event.
+        """
+
+        for listener in self.listeners:
+            listener(event, fields)
+
+        if self._events is None:
+            return
+
+        line = json.dumps({"time": time.time(), "event": event, **fields})
+        with self._lock:
+            self._events.write(line + '\n')
+            self._events.flush()
+
+    def start_item(self, url: str, media: str):
+        """
+        Start timing a URL.
+
+        :param str url: The URL.
+        :param str media: The type of media to download.
+
+        :returns dict: The record of the URL.
+        """
+
+        return {
+            "url": url,
+            "media": media,
+            "id": None,
+            "title": None,
+            "status": None,
+            "phases": {},
+            "bytes": 0,
+            "files": 0
+        }
+
+    def add_phase(self, record: dict, phase: str, seconds: float):
+        """
+        Add the time spent in a phase to <record>.
+
+        :param dict record: The record of the URL.
+        :param str phase: The name of the phase.
+        :param float seconds: The time spent.
+        """
+
+        record["phases"][phase] = record["phases"].get(phase, 0) + seconds
+        self._event("phase", url=record["url"], phase=phase, seconds=seconds)
+
+    @contextlib.contextmanager
+    def phase(self, record: dict, phase: str):
+        """
+        Time the code inside the `with` block as <phase>.
+
+        :param dict record: The record of the URL.
+        :param str phase: The name of the phase.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+
+        finally:
+            self.add_phase(record, phase, time.perf_counter() - start)
+
+    def begin_transfer(self, job_name: str, record: dict):
+        """
+        Start timing the download of <record>.
+
+        The post-processing runs later in the post-processing pool, which
+        reports its own time as the `postprocess` phase.
+
+        :param str job_name: The name of the job.
+        :param dict record: The record of the URL.
+        """
+
+        record["_transfer"] = time.perf_counter()
+        self._jobs[job_name] = record
+
+    def file_finished(self, job_name: str, d: dict):
+        """
+        Count a finished download. This is called by the progress hooks.
+
+        :param str job_name: The name of the job.
+        :param dict d: The argument youtube_dl sends to the progress hooks.
+        """
+
+        record = self._jobs.get(job_name)
+        if record is None:
+            return
+
+        record["bytes"] += d.get("total_bytes") or d.get("downloaded_bytes") or 0
+        record["files"] += 1
+
+    def end_transfer(self, job_name: str):
+        """
+        Stop timing the download of the current record of <job_name>.
+
+        :param str job_name: The name of the job.
+        """
+
+        record = self._jobs.pop(job_name)
+        self.add_phase(record, "download", time.perf_counter() - record.pop("_transfer"))
+
+    def finish_item(self, record: dict, url_result: tuple, url_info: dict = None):
+        """
+        Add <record> to the report.
+
+        :param dict record: The record of the URL.
+        :param tuple url_result: The result key (success, failed, skipped, or playlist) and a tuple of the url and title. (And the error message of some failures.)
+        :param dict url_info: The info dict of the URL, if it was extracted.
+        """
+
+        record["status"], record["title"] = url_result[0], url_result[1][1]
+        if len(url_result[1]) > 2:
+            record["error"] = url_result[1][2]
+
+        if url_info is not None:
+            record["id"] = url_info.get("id")
+
+        with self._lock:
+            self.items.append(record)
+
+        self._event("item", **record)
+
+    def to_dict(self):
+        """
+        Make the report.
+
+        :returns dict: The totals and the records of every URL.
+        """
+
+        with self._lock:
+            items = list(self.items)
+
+        totals = {
+            "items": len(items),
+            "bytes": sum(item["bytes"] for item in items),
+            "phases": {phase: sum(item["phases"].get(phase, 0) for item in items) for phase in phases}
+        }
+        for item in items:
+            totals[item["status"]] = totals.get(item["status"], 0) + 1
+
+        finished = time.time()
+        return {
+            "started": self.started,
+            "finished": finished,
+            "duration": finished - self.started,
+            "totals": totals,
+            "items": items
+        }
+
+    def write(self, report_path: str):
+        """
+        Write the report to <report_path> as JSON.
+
+        :param str report_path: Where to write the report.
+        """
+
+        self.logger.info(f"Writing the run report to `{report_path}`.")
+        with open(report_path, 'w', encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    def close(self):
+        """
+        Close the event stream.
+        """
+
+        if self._events is not None:
+            self._events.close()
+            self._events = None
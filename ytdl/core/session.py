@@ -0,0 +1,128 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import threading
+
+# The YoutubeDL options that the postprocessors use.
+postprocessing_params = ("keepvideo", "ffmpeg_location", "prefer_ffmpeg", "postprocessor_args", "verbose")
+
+
+def run_postprocessing(jobs: list, pp_defs: list, params: dict):
+    """
+    Run the post-processing jobs collected by a Session() in a worker process of the post-processing pool.
+
+    See `youtubedl.run_postprocessing()`.
+    """
+
+    from core import youtubedl
+    return youtubedl.run_postprocessing(jobs, pp_defs, params)
+
+
+class Session():
+    """
+    Keeps configured YoutubeDL objects alive for a whole batch of URLs.
+
+    Creating a YoutubeDL object initializes every extractor, the cookie jar,
+    and the URL opener, so each worker thread creates one on its first URL
+    and reuses it for the rest of the batch.
+
+    The YoutubeDL objects do not post-process anything by themselves; see
+    `postprocessing_args()`.
+    """
+
+    def __init__(self, ydl_opts: dict, logger, hook_factory = None, extractors: list = None):
+        """
+        The initialization method of Session() class.
+
+        :param dict ydl_opts: The YouTube-DL options shared by every URL in the batch.
+        :param class logger: The logger class.
+        :param function hook_factory: A function that returns a new YTDLHook() object. (Optional)
+        :param list extractors: InfoExtractor classes to try before the default ones. (Optional)
+        """
+
+        self.ydl_opts = ydl_opts
+        self.logger = logger
+        self.hook_factory = hook_factory
+        self.extractors = extractors or []
+        self._local = threading.local()
+
+    def get(self, **params):
+        """
+        Get the YoutubeDL object of the current worker thread.
+
+        :param **params: YouTube-DL options to change for the next URL. (e.g., `outtmpl`)
+
+        :returns class: A YoutubeDL object.
+        """
+
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            self.logger.info("Creating a YoutubeDL object for this worker.")
+            ydl_opts = dict(self.ydl_opts)
+            ydl_opts["postprocessors"] = []  # Added by `run_postprocessing()`, since youtube_dl does not know our own postprocessors.
+            if self.hook_factory is not None:
+                hook = self.hook_factory()
+                ydl_opts["progress_hooks"] = [hook.main]
+                ydl_opts["postprocessor_hooks"] = [hook.postprocessor]
+
+            from core import youtubedl  # Only imported when the first URL needs youtube_dl.
+            ydl = youtubedl.DeferredYoutubeDL(ydl_opts, auto_init=len(self.extractors) == 0)
+            if len(self.extractors) > 0:
+                # youtube_dl uses the first extractor that accepts the URL.
+                for ie_class in self.extractors:
+                    ydl.add_info_extractor(ie_class())
+
+                ydl.print_debug_header()
+                ydl.add_default_info_extractors()
+
+            self._local.ydl = ydl
+
+        ydl.params.update(params)
+        # The return code is never reset by youtube_dl, so a failed URL
+        # would make every URL after it look like it failed too.
+        ydl._download_retcode = 0
+        return ydl
+
+    def postprocessing_args(self, ydl):
+        """
+        Take the post-processing jobs collected by <ydl>.
+
+        :param class ydl: The YoutubeDL object returned by `get()`.
+
+        :returns tuple: The arguments of `run_postprocessing()`, or None if there is nothing to post-process.
+        """
+
+        jobs = ydl.take_deferred()
+        pp_defs = self.ydl_opts.get("postprocessors", [])
+        if len(jobs) == 0:
+            return None  # Nothing was downloaded. (e.g., `--simulate` or a URL rejected by the match filter)
+
+        if len(pp_defs) == 0 and all(len(info["__postprocessors"]) == 0 for _, info in jobs):
+            return None
+
+        params = {key: ydl.params[key] for key in postprocessing_params if key in ydl.params}
+        return jobs, pp_defs, params
@@ -0,0 +1,160 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+import re
+import sys
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+# The hostnames that serve YouTube videos.
+youtube_hosts = (
+    "youtube.com",
+    "www.youtube.com",
+    "m.youtube.com",
+    "music.youtube.com",
+    "youtube-nocookie.com",
+    "www.youtube-nocookie.com"
+)
+youtube_id_regex = re.compile(r"^[0-9A-Za-z_-]{11}$")
+
+
+def youtube_id(url: str):
+    """
+    Get the video ID from a YouTube URL without making any network requests.
+
+    Supported forms are `/watch?v=<id>`, `youtu.be/<id>`, `/shorts/<id>`, and
+    `/embed/<id>`. URLs with a `list` parameter are treated as playlists.
+
+    :param str url: The URL of the YouTube video.
+
+    :returns str: The video ID, or None if it cannot be derived from the URL.
+    """
+
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url  # e.g., `youtu.be/<id>`
+
+    parsed_url = urlparse(url)
+    if parsed_url.scheme not in ("http", "https"):
+        return None
+
+    hostname = (parsed_url.hostname or "").lower()
+    query = parse_qs(parsed_url.query)
+    if "list" in query:
+        return None  # youtube_dl downloads the whole playlist.
+
+    path = parsed_url.path.split('/')
+    if hostname == "youtu.be":
+        video_id = path[1] if len(path) > 1 else None
+
+    elif hostname in youtube_hosts:
+        if parsed_url.path == "/watch":
+            video_id = query.get('v', [None])[0]
+
+        elif len(path) > 2 and path[1] in ("shorts", "embed"):
+            video_id = path[2]
+
+        else:
+            return None
+
+    else:
+        return None
+
+    if video_id is None or youtube_id_regex.match(video_id) is None:
+        return None
+
+    return video_id
+
+
+def canonical_key(url: str):
+    """
+    Get the key that identifies the media of <url>, so that different URLs of the same video are equal.
+
+    :param str url: The URL of the YouTube video/playlist.
+
+    :returns str: The archive key of the video if its ID is known (e.g., `youtube dQw4w9WgXcQ`), or the stripped URL.
+    """
+
+    video_id = youtube_id(url)
+    if video_id is None:
+        return url.strip()
+
+    return f"youtube {video_id}"
+
+
+def read_urls(sources: list, logger = None):
+    """
+    Read the URLs in <sources> lazily, skipping the duplicates.
+
+    Each source is a URL, a file containing one URL per line, or `-` for
+    the standard input. Files and the standard input are read line by line
+    while the URLs are downloaded, so a producer can pipe URLs in as they
+    are found.
+
+    :param list sources: The URLs, filepaths, or `-`.
+    :param class logger: The logger class. (Optional)
+
+    :returns generator: The URLs, in order.
+    """
+
+    seen = set()  # The canonical keys of the URLs that were already yielded.
+    for source in sources:
+        if source == '-':
+            if logger is not None:
+                logger.info("Reading URLs from the standard input.")
+
+            lines = sys.stdin
+
+        elif os.path.isfile(source):
+            if logger is not None:
+                logger.info(f"Reading URLs from `{source}`.")
+
+            lines = open(source, 'r', encoding="utf-8")
+
+        else:
+            lines = [source]
+
+        try:
+            for line in lines:
+                url = line.strip()
+                if url == '':
+                    continue
+
+                key = canonical_key(url)
+                if key in seen:
+                    if logger is not None:
+                        logger.info(f"Skipping duplicate URL `{url}`.")
+
+                    continue
+
+                seen.add(key)
+                yield url
+
+        finally:
+            if lines is not sys.stdin and hasattr(lines, "close"):
+                lines.close()
@@ -0,0 +1,182 @@
+"""
+This is free and unencumbered software released into the public domain.
+
+Anyone is free to copy, modify, publish, use, compile, sell, or
+distribute this software, either in source code form or as a compiled
+binary, for any purpose, commercial or non-commercial, and by any
+means.
+
+In jurisdictions that recognize copyright laws, the author or authors
+of this software dedicate any and all copyright interest in the
+software to the public domain. We make this dedication for the benefit
+of the public at large and to the detriment of our heirs and
+successors. We intend this dedication to be an overt act of
+relinquishment in perpetuity of all present and future rights to this
+software under copyright law.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+
+For more information, please refer to <https://unlicense.org>
+"""
+
+import os
+import time
+
+import youtube_dl
+from youtube_dl import postprocessor
+
+from core import ranges  # Registers RangeFD for HTTP(S) downloads.
+from core import manifest
+from core import postprocessors
+from core import default_logger
+
+# Importing youtube_dl loads every extractor, which takes longer than the rest of
+# YTDLer together, so `session` only imports this module when a URL needs it.
+
+# The YoutubeDL objects of the post-processing worker process, by their options.
+_postprocessing_ydls = {}
+
+
+class PostprocessingFailed(Exception):
+    """
+    Raised by `run_postprocessing()` when a postprocessor fails.
+
+    youtube_dl's errors keep the traceback of their cause, which cannot be
+    pickled, so they would reach the main process as a pickling error
+    instead. This only keeps the message.
+    """
+
+
+def add_postprocessors(ydl, pp_defs: list):
+    """
+    Add the postprocessors in <pp_defs> to <ydl>.
+
+    :param class ydl: The YoutubeDL object.
+    :param list pp_defs: The postprocessors, in the same format as the `postprocessors` YouTube-DL option.
+    """
+
+    for pp_def in pp_defs:
+        pp_def = dict(pp_def)
+        pp_class = postprocessors.get_postprocessor(pp_def.pop("key"))
+        ydl.add_post_processor(pp_class(ydl, **pp_def))
+
+
+def run_postprocessing(jobs: list, pp_defs: list, params: dict):
+    """
+    Run the post-processing jobs collected by DeferredYoutubeDL().
+
+    This runs in a worker process of the post-processing pool.
+
+    :param list jobs: A list of tuples of the filename and the info dict to post-process.
+    :param list pp_defs: The postprocessors, in the same format as the `postprocessors` YouTube-DL option.
+    :param dict params: The YouTube-DL options that the postprocessors use.
+
+    :returns tuple: How long (in seconds) the post-processing took, and a list of the files
+                    that each postprocessor produced and deleted. (See `manifest.postprocessor_files()`)
+
+    :raises PostprocessingFailed: If a postprocessor fails.
+    """
+
+    try:
+        return _run_postprocessing(jobs, pp_defs, params)
+
+    except PostprocessingFailed:
+        raise
+
+    except Exception as e:
+        raise PostprocessingFailed(str(e)) from None
+
+
+def _run_postprocessing(jobs: list, pp_defs: list, params: dict):
+    start = time.perf_counter()
+    key = repr((pp_defs, sorted(params.items())))
+    ydl = _postprocessing_ydls.get(key)
+    if ydl is None:
+        ydl = PostprocessingYoutubeDL(dict(params, logger=default_logger.Logger()), auto_init=False)
+        add_postprocessors(ydl, pp_defs)
+        _postprocessing_ydls[key] = ydl
+
+    files = []
+    ydl.params["postprocessor_hooks"] = [lambda d: files.append(manifest.postprocessor_files(d))]
+
+    # The postprocessors scheduled by YouTube-DL that a fused postprocessor does the work of. (e.g., `FFmpegFusedVideoPP()`)
+    fused = {name for pp in ydl._pps for name in getattr(pp, "fuses", ())}
+    for filename, info in jobs:
+        info = dict(info)
+        info["__fused_postprocessors"] = [name for name in info["__postprocessors"] if name in fused]
+        info["__postprocessors"] = [getattr(postprocessor, name)(ydl) for name in info["__postprocessors"] if name not in fused]
+        ydl.post_process(filename, info)
+
+    return time.perf_counter() - start, files
+
+
+class PostprocessingYoutubeDL(youtube_dl.YoutubeDL):
+    """
+    The YoutubeDL object of the post-processing worker process.
+
+    It calls the `postprocessor_hooks` after each postprocessor, so that
+    the files it produces and deletes are known without listing folders.
+    """
+
+    def post_process(self, filename, ie_info):
+        # This is `YoutubeDL.post_process()` with the postprocessor hooks.
+        info = dict(ie_info)
+        info["filepath"] = filename
+        for pp in (ie_info.get("__postprocessors") or []) + self._pps:
+            files_to_delete = []
+            try:
+                files_to_delete, info = pp.run(info)
+
+            except Exception as e:
+                message = e.msg if isinstance(e, youtube_dl.utils.PostProcessingError) else str(e)
+                raise PostprocessingFailed(f"{type(pp).__name__}: {message}") from None
+
+            if files_to_delete and self.params.get("keepvideo", False):
+                files_to_delete = []
+
+            for old_filename in files_to_delete:
+                self.to_screen(f"Deleting original file {old_filename} (pass -k to keep)")
+                try:
+                    os.remove(old_filename)
+
+                except OSError:
+                    self.report_warning("Unable to remove downloaded original file")
+
+            postprocessors.report_postprocessed(self, info, files_to_delete)
+
+
+class DeferredYoutubeDL(youtube_dl.YoutubeDL):
+    """
+    A YoutubeDL object that collects the post-processing of each download
+    instead of running it, so that it can run in another process while
+    the next download starts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.deferred = []  # A list of tuples of the filename and the info dict to post-process.
+        super().__init__(*args, **kwargs)
+
+    def post_process(self, filename, ie_info):
+        info = dict(ie_info)
+        # The merger and fixup postprocessors keep a reference to this object,
+        # so only their names are kept and they are created again later.
+        info["__postprocessors"] = [type(pp).__name__ for pp in ie_info.get("__postprocessors") or []]
+        self.deferred.append((filename, info))
+        postprocessors.report_postprocessed(self, dict(info, filepath=filename), status="started")
+
+    def take_deferred(self):
+        """
+        Get and clear the collected post-processing jobs.
+
+        :returns list: A list of tuples of the filename and the info dict to post-process.
+        """
+
+        deferred = self.deferred
+        self.deferred = []
+        return deferred
@@ -29,6 +29,15 @@ import os
 
 from core import api
 from core import info
+from core import daemon
+from core import archive
+from core import downloader
+from core import journal
+from core import urls
+from core import report
+from core import metrics
+from core import bandwidth
+from core import finalize
 
 
 class Main():
@@ -42,7 +51,26 @@ class Main():
         quality_override: bool,
         debug: bool,
         simulate: bool,
-        logger
+        logger,
+        jobs: int = 1,
+        prefetch: int = 2,
+        connections: int = 1,
+        limit_rate: str = None,
+        job_weights: str = None,
+        bandwidth_file: str = None,
+        cache_ttl: int = info.info_cache_ttl,
+        format_cache_ttl: int = info.format_cache_ttl,
+        rebuild_archive: bool = False,
+        report_path: str = None,
+        events_path: str = None,
+        metrics_path: str = None,
+        metrics_port: int = None,
+        fsync: str = "file",
+        journal_path: str = None,
+        resume_path: str = None,
+        partial_max_age: int = info.partial_max_age,
+        partial_budget: str = None,
+        daemon_port: int = None
     ):
         self.url = url
         self.video = video
@@ -52,6 +80,31 @@ class Main():
         self.quality_override = quality_override
         self.debug = debug
         self.simulate = simulate
+        self.jobs = jobs
+        self.prefetch = prefetch
+        self.connections = connections
+        self.limit_rate = limit_rate
+        self.job_weights = job_weights
+        self.bandwidth_file = bandwidth_file
+        self.cache_ttl = cache_ttl
+        self.format_cache_ttl = format_cache_ttl
+        self.rebuild_archive = rebuild_archive
+        self.report_path = report_path
+        self.events_path = events_path
+        self.metrics_path = metrics_path
+        self.metrics_port = metrics_port
+        self.fsync = fsync
+        self.journal_path = journal_path
+        self.resume_path = resume_path
+        self.partial_max_age = partial_max_age
+        self.partial_budget = partial_budget
+        self.partial_budget_bytes = 0  # <partial_budget> in bytes, parsed by `main()`.
+        self.daemon_port = daemon_port
+        self.download_archive = None  # Shared by every job in daemon mode.
+        self.postprocessing_pool = None  # Shared by every job in daemon mode.
+        self.run_report = None
+        self.run_metrics = None
+        self.journal = None
         self.logger = logger
 
         self.logger.info("ytdl.Main().main() is called.")
@@ -59,7 +112,67 @@ class Main():
         self.cookie_filepath = os.path.join(os.getcwd(), "cookies.txt")
 
     def main(self):
-        if self.url is None:
+        if self.rebuild_archive:
+            self.logger.info("Rebuilding the download archive...")
+            added = api.rebuild_archive(info.download_path, self.logger)
+            print(f"[i] Added {added} videos to the download archive.")
+            if self.url is None and self.resume_path is None and self.daemon_port is None:
+                return 0
+
+        self.logger.info("Setting the bandwidth limit...")
+        try:
+            limit, weights = bandwidth.BandwidthScheduler.parse(f"{self.limit_rate or 0}\n{self.job_weights or ''}")
+
+        except ValueError as e:
+            print(f"[E] {e}")
+            self.logger.error(f"Invalid bandwidth limit or job weights: {e}")
+            return 1
+
+        bandwidth.scheduler.configure(limit, weights, self.bandwidth_file, self.logger)
+
+        if self.fsync not in finalize.fsync_policies:
+            print(f"[E] `--fsync` must be one of {', '.join(finalize.fsync_policies)}.")
+            self.logger.error(f"Invalid fsync policy: {self.fsync}")
+            return 1
+
+        self.partial_budget_bytes = bandwidth.parse_bytes(self.partial_budget or "0")
+        if self.partial_budget_bytes is None:
+            print(f"[E] Invalid partial download budget: {self.partial_budget}")
+            self.logger.error(f"Invalid partial download budget: {self.partial_budget}")
+            return 1
+
+        if self.resume_path is not None and self.daemon_port is not None:
+            print("[E] `--resume` cannot be used with `--daemon`, since each job has its own journal. (Resume the journal of a job without `--daemon`.)")
+            self.logger.error("`--resume` was used with `--daemon`. Returning 1")
+            return 1
+
+        if self.resume_path is not None:
+            if not os.path.exists(self.resume_path):
+                print(f"[E] The journal `{self.resume_path}` does not exist.")
+                self.logger.error(f"The journal to resume does not exist: {self.resume_path}")
+                return 1
+
+            self.logger.info(f"Resuming the run recorded in `{self.resume_path}`.")
+            self.journal = journal.Journal(self.resume_path, self.logger)
+
+        elif self.journal_path is not None and self.daemon_port is None:  # In daemon mode, see `daemon.Daemon._job_path()`.
+            if os.path.exists(self.journal_path):
+                print(f"[E] The journal `{self.journal_path}` already exists. (Use `--resume` to continue its run.)")
+                self.logger.error(f"The journal already exists: {self.journal_path}")
+                return 1
+
+            self.logger.info(f"Recording the run to `{self.journal_path}`.")
+            self.journal = journal.Journal(self.journal_path, self.logger, None if self.url is None else self.url.split(','))
+
+        if self.journal is not None:
+            self.journal.start()
+
+        if self.url is None and self.journal is not None and self.journal.sources:
+            url = self.journal.sources  # Read the same URLs as the interrupted run.
+            if '-' in url:
+                print("[!] The interrupted run read URLs from the standard input; pipe them in again.")
+
+        elif self.url is None:
             url = []
 
         elif ',' in self.url:
@@ -68,35 +181,28 @@ class Main():
         else:
             url = [self.url]
 
-        url_list = []
-        if len(url) < 1:
+        if len(url) < 1 and self.daemon_port is None:
             print("[E] There are no URLs to work with. (Use `--help` for more information.)")
             self.logger.error("There are no URLs to work with. Returning 1")
-            return 1
-
-        self.logger.info("Checking if argument is a file...")
-        for i in url:
-            if os.path.exists(i):
-                self.logger.info("argument is a file, getting its contents.")
-                with open(i, 'r') as f:
-                    for url in f.readlines():
-                        if url == '':
-                            continue
+            if self.journal is not None:
+                self.journal.close()
 
-                        elif url.startswith(('\n', '\r')):
-                            continue
+            return 1
 
-                        self.logger.info("Adding a URL to url list.")
-                        url_list.append(url.replace('\n', ''))
+        if self.daemon_port is not None and '-' in url:
+            print("[E] The daemon cannot read URLs from the standard input. (Pipe them to `python ytdl submit -` instead.)")
+            self.logger.error("The standard input was given as a URL source in daemon mode. Returning 1")
+            return 1
 
-            else:
-                url_list.append(i)
-                self.logger.info("argument is not a file, added to url list.")
+        # URL files and the standard input are read while downloading.
+        url_list = urls.read_urls(url, self.logger)
+        if self.video and self.audio and self.no_audio:
+            url_list = list(url_list)  # The URLs are downloaded twice, once for each mode.
 
         if self.debug:
             print("[i] Debug mode is on.")
             print()
-            print("url:", url_list)
+            print("url:", url)
             print("video:", self.video)
             print("audio:", self.audio)
             print("no_subs:", self.no_subs)
@@ -104,21 +210,57 @@ class Main():
             print("quality_override:", self.quality_override)
             print("debug:", self.debug)
             print("simulate:", self.simulate)
+            print("jobs:", self.jobs)
+            print("prefetch:", self.prefetch)
+            print("connections:", self.connections)
+            print("limit_rate:", self.limit_rate)
+            print("job_weights:", self.job_weights)
+            print("bandwidth_file:", self.bandwidth_file)
+            print("cache_ttl:", self.cache_ttl)
+            print("format_cache_ttl:", self.format_cache_ttl)
+            print("report_path:", self.report_path)
+            print("events_path:", self.events_path)
+            print("metrics_path:", self.metrics_path)
+            print("metrics_port:", self.metrics_port)
+            print("fsync:", self.fsync)
+            print("journal_path:", self.journal_path)
+            print("resume_path:", self.resume_path)
+            print("partial_max_age:", self.partial_max_age)
+            print("partial_budget:", self.partial_budget)
+            print("daemon_port:", self.daemon_port)
             print()
             self.logger.debug(
                 {
-                    "url": url_list,
+                    "url": url,
                     "video": self.video,
                     "audio": self.audio,
                     "no_subs": self.no_subs,
                     "no_audio": self.no_audio,
                     "quality_override": self.quality_override,
                     "debug": self.debug,
-                    "simulate": self.simulate
+                    "simulate": self.simulate,
+                    "jobs": self.jobs,
+                    "prefetch": self.prefetch,
+                    "connections": self.connections,
+                    "limit_rate": self.limit_rate,
+                    "job_weights": self.job_weights,
+                    "bandwidth_file": self.bandwidth_file,
+                    "cache_ttl": self.cache_ttl,
+                    "format_cache_ttl": self.format_cache_ttl,
+                    "report_path": self.report_path,
+                    "events_path": self.events_path,
+                    "metrics_path": self.metrics_path,
+                    "metrics_port": self.metrics_port,
+                    "fsync": self.fsync,
+                    "journal_path": self.journal_path,
+                    "resume_path": self.resume_path,
+                    "partial_max_age": self.partial_max_age,
+                    "partial_budget": self.partial_budget,
+                    "daemon_port": self.daemon_port
                 }
             )
 
-        if not self.video and not self.audio:
+        if not self.video and not self.audio and self.daemon_port is None:
             print("[E] There are no commands. Use `--video` or `--audio`. (Use `--help` for more information.)")
 
         error_code = 0
@@ -138,122 +280,159 @@ class Main():
             self.logger.info("`cookies.txt` does not exist.")
             cookie_exists = False
 
-        if self.video:
-            self.logger.info("Video download mode. Calling api.Download().video() method.")
-            if cookie_exists:
-                self.logger.info("Downloading using `cookies.txt`.")
-                downloads = api.Download(
-                    url=url_list,
-                    download_path=info.download_path,
-                    temp_dl_path=info.temp_dl_path,
-                    logger=self.logger,
-                    debug=self.debug,
-                    simulate=self.simulate,
-                    cookie_filepath=self.cookie_filepath
-                ).video(
-                    not self.no_subs,
-                    self.no_audio,
-                    self.quality_override
-                )
-
-            else:
-                self.logger.info("Downloading without `cookies.txt`.")
-                downloads = api.Download(
-                    url=url_list,
-                    download_path=info.download_path,
-                    temp_dl_path=info.temp_dl_path,
-                    logger=self.logger,
-                    debug=self.debug,
-                    simulate=self.simulate
-                ).video(
-                    not self.no_subs,
-                    self.no_audio,
-                    self.quality_override
-                )
-
-            self.logger.info("Downloads finished, printing results.")
+        self.run_report = report.RunReport(self.logger, self.events_path)
+        self.run_metrics = metrics.Metrics(self.logger)
+        self.run_metrics.start(self.metrics_path, self.metrics_port)
+        try:
+            if self.daemon_port is not None:
+                # Keep the archive and the post-processing processes warm for every job.
+                self.download_archive = archive.DownloadArchive(os.path.join(info.download_path, info.archive_file), self.logger)
+                self.postprocessing_pool = downloader.make_postprocessing_pool()
+                try:
+                    ytdl_daemon = daemon.Daemon(self, cookie_exists, self.logger)
+                    if len(url) > 0:
+                        # The URLs given on the command line are the first job.
+                        ytdl_daemon.submit(url, self.video or not self.audio, self.audio, self.no_subs, self.no_audio)
 
-            print()
-            print("==================== Results ====================")
-            if len(downloads["success"]) > 0:
-                print()
-                print("Completed downloads:")
-                for url in downloads["success"]:
-                    print("    +", url[0], f"({url[1]})")
-
-            if len(downloads["failed"]) > 0:
-                print()
-                print("Failed downloads:")
-                for url in downloads["failed"]:
-                    print("    -", url[0], f"({url[1]})")
-
-            if len(downloads["skipped"]) > 0:
-                print()
-                print("Skipped downloads:")
-                for url in downloads["skipped"]:
-                    print("    *", url[0], f"({url[1]})")
+                    ytdl_daemon.serve(self.daemon_port)
 
-            print()
-            print("=================================================")
-            if len(downloads["failed"]) != 0:
-                error_code += 4
+                finally:
+                    self.postprocessing_pool.shutdown()
 
-        if self.audio:
+                return error_code
+
+            for downloads in self.download(url_list, cookie_exists, self.video, self.audio, self.no_subs, self.no_audio):
+                error_code += self._print_results(downloads)
+
+        finally:
+            if self.report_path is not None and self.daemon_port is None:  # In daemon mode, each job writes its own report.
+                self.run_report.write(self.report_path)
+                print(f"[i] The run report is saved to `{self.report_path}`.")
+
+            self.run_report.close()
+            self.run_metrics.stop()
+            if self.journal is not None:
+                self.journal.close()
+
+        return error_code
+
+    def download(self, url_list: list, cookie_exists: bool, video: bool, audio: bool, no_subs: bool, no_audio: bool, run_report = None, run_journal = None):
+        """
+        Download <url_list> in the modes that are selected.
+
+        :param list url_list: The URLs to download.
+        :param bool cookie_exists: Use `cookies.txt`?
+        :param bool video: Download video and audio.
+        :param bool audio: Download audio only.
+        :param bool no_subs: Do not download video subtitles/audio lyrics.
+        :param bool no_audio: Do not download audio. (Only when <video> is True.)
+        :param class run_report: The report.RunReport() object to use instead of the one of the run. (Optional)
+        :param class run_journal: The journal.Journal() object to use instead of the one of the run. (Optional)
+
+        :returns generator: The dictionary returned by api.Download() for each mode, as they finish.
+        """
+
+        if video and audio and not no_audio:
+            # Extract and download each URL only once, then derive the audio file from the video's audio stream.
+            self.logger.info("Video and audio download mode. Calling api.Download().video_audio() method.")
+            yield self._download_api(url_list, cookie_exists, run_report, run_journal).video_audio(
+                not no_subs,
+                self.quality_override
+            )
+            return
+
+        if video:
+            self.logger.info("Video download mode. Calling api.Download().video() method.")
+            yield self._download_api(url_list, cookie_exists, run_report, run_journal).video(
+                not no_subs,
+                no_audio,
+                self.quality_override
+            )
+
+        if audio:
             self.logger.info("Audio download mode. Calling api.Download().audio() method.")
-            if cookie_exists:
-                self.logger.info("Downloading using `cookies.txt`.")
-                downloads = api.Download(
-                    url=url_list,
-                    download_path=info.download_path,
-                    temp_dl_path=info.temp_dl_path,
-                    logger=self.logger,
-                    debug=self.debug,
-                    simulate=self.simulate,
-                    cookie_filepath=self.cookie_filepath
-                ).audio(
-                    self.no_subs,
-                    self.quality_override
-                )
-
-            else:
-                self.logger.info("Downloading without `cookies.txt`.")
-                downloads = api.Download(
-                    url=url_list,
-                    download_path=info.download_path,
-                    temp_dl_path=info.temp_dl_path,
-                    logger=self.logger,
-                    debug=self.debug,
-                    simulate=self.simulate
-                ).audio(
-                    self.no_subs,
-                    self.quality_override
-                )
-
-            self.logger.info("Downloads finished, printing results.")
+            yield self._download_api(url_list, cookie_exists, run_report, run_journal).audio(
+                no_subs,
+                self.quality_override
+            )
+
+    def _download_api(self, url_list: list, cookie_exists: bool, run_report = None, run_journal = None):
+        """
+        Create the api.Download() object to use.
+
+        :param list url_list: The URLs to download.
+        :param bool cookie_exists: Use `cookies.txt`?
+        :param class run_report: The report.RunReport() object to use instead of the one of the run. (Optional)
+        :param class run_journal: The journal.Journal() object to use instead of the one of the run. (Optional)
+
+        :returns class: An api.Download() object.
+        """
+
+        if cookie_exists:
+            self.logger.info("Downloading using `cookies.txt`.")
+            cookie_filepath = self.cookie_filepath
 
+        else:
+            self.logger.info("Downloading without `cookies.txt`.")
+            cookie_filepath = None
+
+        return api.Download(
+            url=url_list,
+            download_path=info.download_path,
+            temp_dl_path=info.temp_dl_path,
+            logger=self.logger,
+            debug=self.debug,
+            simulate=self.simulate,
+            cookie_filepath=cookie_filepath,
+            jobs=self.jobs,
+            prefetch=self.prefetch,
+            connections=self.connections,
+            cache_ttl=self.cache_ttl,
+            format_cache_ttl=self.format_cache_ttl,
+            run_report=run_report or self.run_report,
+            run_metrics=self.run_metrics,
+            fsync=self.fsync,
+            journal=run_journal or self.journal,
+            partial_max_age=self.partial_max_age,
+            partial_budget=self.partial_budget_bytes,
+            download_archive=self.download_archive,
+            postprocessing_pool=self.postprocessing_pool
+        )
+
+    def _print_results(self, downloads: dict):
+        """
+        Print the results of the downloads.
+
+        :param dict downloads: The dictionary returned by api.Download().
+
+        :returns int: The error code to add. (4 if there are failed downloads)
+        """
+
+        self.logger.info("Downloads finished, printing results.")
+
+        print()
+        print("==================== Results ====================")
+        if len(downloads["success"]) > 0:
             print()
-            print("==================== Results ====================")
-            if len(downloads["success"]) > 0:
-                print()
-                print("Completed downloads:")
-                for url in downloads["success"]:
-                    print("    +", url[0], f"({url[1]})")
-
-            if len(downloads["failed"]) > 0:
-                print()
-                print("Failed downloads:")
-                for url in downloads["failed"]:
-                    print("    -", url[0], f"({url[1]})")
-
-            if len(downloads["skipped"]) > 0:
-                print()
-                print("Skipped downloads:")
-                for url in downloads["skipped"]:
-                    print("    *", url[0], f"({url[1]})")
+            print("Completed downloads:")
+            for url in downloads["success"]:
+                print("    +", url[0], f"({url[1]})")
 
+        if len(downloads["failed"]) > 0:
             print()
-            print("=================================================")
-            if len(downloads["failed"]) != 0:
-                error_code += 4
+            print("Failed downloads:")
+            for url in downloads["failed"]:
+                print("    -", url[0], f"({url[1]})", *([f"-> {url[2]}"] if len(url) > 2 else []))
 
-        return error_code
+        if len(downloads["skipped"]) > 0:
+            print()
+            print("Skipped downloads:")
+            for url in downloads["skipped"]:
+                print("    *", url[0], f"({url[1]})")
+
+        print()
+        print("=================================================")
+        if len(downloads["failed"]) != 0:
+            return 4
+
+        return 0